@@ -3,6 +3,20 @@
 # Assignment: Assignment 6 - HashMap
 # Description: Implementation of an SC (Separate Chaining) and OA (Open Addressing) HashMap.
 
+import io
+import os
+import pickle
+from array import array
+from bisect import bisect_left
+import struct
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional; hash_many falls back to hashing key by key
+    np = None
+
+
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
 
 class DynamicArrayException(Exception):
@@ -13,27 +27,51 @@ class DynamicArray:
     """
     Class implementing a Dynamic Array
     Supported methods are:
-    append, pop, swap, get_at_index, set_at_index, length
+    append, extend, fill, pop, swap, get_at_index, set_at_index, slice, length, raw
     """
 
-    def __init__(self, arr=None) -> None:
-        """Initialize new dynamic array using a list."""
-        self._data = arr.copy() if arr else []
-
-    def __iter__(self):
+    def __init__(self, arr=None, typecode: str = None) -> None:
         """
-        Disable iterator capability for DynamicArray class
+        Initialize new dynamic array using a list. With an array module
+        typecode (e.g. 'q' or 'd') the numbers are stored unboxed in a typed array.
         """
-        return None
+        self._typecode = typecode
+        if typecode is not None:
+            self._data = array(typecode, arr if arr else ())
+        else:
+            self._data = arr.copy() if arr else []
+
+    def __iter__(self):
+        """Return an iterator over the elements of the array."""
+        return iter(self._data)
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
+        if self._typecode is not None:
+            return str(self._data.tolist())
         return str(self._data)
 
     def append(self, value: object) -> None:
         """Add new element at the end of the array."""
         self._data.append(value)
 
+    def extend(self, values) -> None:
+        """Add every element of an iterable at the end of the array."""
+        self._data.extend(values)
+
+    def fill(self, count: int, value: object) -> None:
+        """Add count copies of value at the end of the array."""
+        if self._typecode is not None:
+            copies = array(self._typecode, (value,)) * count
+        else:
+            copies = [value] * count
+
+        # An empty array takes the copies over instead of copying them again
+        if len(self._data):
+            self._data.extend(copies)
+        else:
+            self._data = copies
+
     def pop(self):
         """Remove element from end of the array and return it."""
         return self._data.pop()
@@ -44,28 +82,52 @@ class DynamicArray:
 
     def get_at_index(self, index: int):
         """Return value of element at a given index."""
-        if index < 0 or index >= self.length():
+        if index < 0 or index >= len(self._data):
             raise DynamicArrayException
         return self._data[index]
 
     def __getitem__(self, index: int):
         """Return value of element at a given index using [] syntax."""
-        return self.get_at_index(index)
+        # Same checks as get_at_index, without the extra calls on every access
+        if index < 0:
+            raise DynamicArrayException
+        try:
+            return self._data[index]
+        except IndexError:
+            raise DynamicArrayException from None
 
     def set_at_index(self, index: int, value: object) -> None:
         """Set value of element at a given index."""
-        if index < 0 or index >= self.length():
+        if index < 0 or index >= len(self._data):
             raise DynamicArrayException
         self._data[index] = value
 
     def __setitem__(self, index: int, value: object) -> None:
         """Set value of element at a given index using [] syntax."""
-        self.set_at_index(index, value)
+        if index < 0:
+            raise DynamicArrayException
+        try:
+            self._data[index] = value
+        except IndexError:
+            raise DynamicArrayException from None
+
+    def slice(self, start: int, end: int) -> "DynamicArray":
+        """Return a new array holding the elements from start up to, not including, end."""
+        if start < 0 or end > len(self._data) or start > end:
+            raise DynamicArrayException
+        return DynamicArray(self._data[start:end], self._typecode)
 
     def length(self) -> int:
         """Return length of array."""
         return len(self._data)
 
+    def raw(self):
+        """
+        Return the underlying list (or typed array) for internal hot loops.
+        Indexing it skips the bounds checks, so callers keep indices in range.
+        """
+        return self._data
+
 
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
@@ -85,6 +147,300 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+# Odd-only sieve of Eratosthenes: _prime_sieve[i] is 1 when 2 * i + 1 is prime.
+# It is grown by doubling whenever a capacity beyond it is asked for.
+_prime_sieve = bytearray()
+
+
+def _grow_prime_sieve(limit: int) -> None:
+    """Rebuild the prime sieve to cover every odd number up to limit"""
+    global _prime_sieve
+    half = limit // 2 + 1
+    sieve = bytearray([1]) * half
+    sieve[0] = 0
+    for i in range(1, (int(limit ** 0.5) + 1) // 2 + 1):
+        if sieve[i]:
+            prime = 2 * i + 1
+            start = prime * prime // 2
+            sieve[start::prime] = bytes(len(range(start, half, prime)))
+    _prime_sieve = sieve
+
+
+def next_prime(capacity: int) -> int:
+    """
+    Return the smallest odd prime that is at least capacity,
+    looked up in the prime sieve instead of found by trial division
+    """
+    index = max(capacity, 0) // 2
+    found = _prime_sieve.find(1, index)
+    while found == -1:
+        _grow_prime_sieve(max(2 * capacity, 1 << 16))
+        found = _prime_sieve.find(1, index)
+    return 2 * found + 1
+
+
+def is_prime(capacity: int) -> bool:
+    """Return True if capacity is a prime number, using the prime sieve"""
+    if capacity < 3 or capacity % 2 == 0:
+        return capacity == 2
+    return next_prime(capacity) == capacity
+
+
+_MASK64 = (1 << 64) - 1
+
+
+def hash_fnv1a(key: str) -> int:
+    """64-bit FNV-1a hash of the key's UTF-8 bytes"""
+    hash = 0xCBF29CE484222325
+    for byte in key.encode():
+        hash = (hash ^ byte) * 0x100000001B3 & _MASK64
+    return hash
+
+
+def fmix64(hash: int) -> int:
+    """MurmurHash3 64-bit finalizer: every input bit affects every output bit"""
+    hash = (hash ^ (hash >> 33)) * 0xFF51AFD7ED558CCD & _MASK64
+    hash = (hash ^ (hash >> 33)) * 0xC4CEB9FE1A85EC53 & _MASK64
+    return hash ^ (hash >> 33)
+
+
+def hash_mix64(key: str) -> int:
+    """
+    64-bit hash of the key's UTF-8 bytes, read eight bytes at a time
+    and folded through the MurmurHash3 finalizer
+    """
+    data = key.encode()
+
+    # Seeding with the length keeps keys that differ only by trailing zero bytes apart
+    hash = len(data) * 0x9E3779B97F4A7C15 & _MASK64
+    data += bytes(-len(data) % 8)
+    for word in struct.unpack('<%dQ' % (len(data) // 8), data):
+        hash ^= word
+        hash = (hash ^ (hash >> 33)) * 0xFF51AFD7ED558CCD & _MASK64
+        hash = (hash ^ (hash >> 33)) * 0xC4CEB9FE1A85EC53 & _MASK64
+    return fmix64(hash)
+
+
+def _sip_rounds(v0: int, v1: int, v2: int, v3: int, rounds: int) -> tuple:
+    """Apply the given number of SipRounds to the SipHash state"""
+    for _ in range(rounds):
+        v0 = (v0 + v1) & _MASK64
+        v1 = ((v1 << 13) | (v1 >> 51)) & _MASK64 ^ v0
+        v0 = ((v0 << 32) | (v0 >> 32)) & _MASK64
+        v2 = (v2 + v3) & _MASK64
+        v3 = ((v3 << 16) | (v3 >> 48)) & _MASK64 ^ v2
+        v0 = (v0 + v3) & _MASK64
+        v3 = ((v3 << 21) | (v3 >> 43)) & _MASK64 ^ v0
+        v2 = (v2 + v1) & _MASK64
+        v1 = ((v1 << 17) | (v1 >> 47)) & _MASK64 ^ v2
+        v2 = ((v2 << 32) | (v2 >> 32)) & _MASK64
+    return v0, v1, v2, v3
+
+
+def _siphash24(k0: int, k1: int, data: bytes) -> int:
+    """SipHash-2-4 of data under the 128-bit key (k0, k1)"""
+    v0 = k0 ^ 0x736F6D6570736575
+    v1 = k1 ^ 0x646F72616E646F6D
+    v2 = k0 ^ 0x6C7967656E657261
+    v3 = k1 ^ 0x7465646279746573
+
+    # The last block holds the remaining bytes and the length in its top byte
+    whole = len(data) & ~7
+    last = int.from_bytes(data[whole:], 'little') | (len(data) & 0xFF) << 56
+    for word in struct.unpack_from('<%dQ' % (whole // 8), data) + (last,):
+        v3 ^= word
+        v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 2)
+        v0 ^= word
+
+    v2 ^= 0xFF
+    v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 4)
+    return v0 ^ v1 ^ v2 ^ v3
+
+
+def make_siphash(seed: int = None) -> callable:
+    """
+    Return a SipHash-2-4 hash function keyed by a 128-bit seed, or a random one.
+    Without the seed, nobody can pick keys that all land in one bucket,
+    so the maps keep their expected chain and probe lengths on hostile input.
+    The returned function is not found by name, so pass it to load() explicitly.
+    """
+    if seed is None:
+        seed = int.from_bytes(os.urandom(16), 'little')
+    k0, k1 = seed & _MASK64, seed >> 64 & _MASK64
+
+    def hash_siphash(key: str) -> int:
+        """Keyed SipHash-2-4 of the key's UTF-8 bytes"""
+        return _siphash24(k0, k1, key.encode())
+
+    return hash_siphash
+
+
+def hash_many(keys, function: callable = hash_function_1) -> list:
+    """
+    Hash a batch of keys at once and return their hashes as a list, in input order.
+
+    When NumPy is installed, hash_function_1 and hash_function_2 are computed
+    for the whole batch over one contiguous buffer of code points, using
+    prefix sums over each key's slice, and hash_fnv1a runs one byte position
+    of every key at a time in 64-bit lanes. Any other function, or a batch
+    that cannot be encoded, is hashed key by key.
+    """
+    if isinstance(keys, DynamicArray):
+        keys = keys.raw()
+    if np is None or function not in (hash_function_1, hash_function_2, hash_fnv1a):
+        return [function(key) for key in keys]
+
+    keys = list(keys)
+    if function is hash_fnv1a:
+        return _hash_fnv1a_batch(keys)
+    try:
+        codes = np.frombuffer(''.join(keys).encode('utf-32-le'), dtype='<u4').astype(np.int64)
+    except (TypeError, UnicodeEncodeError):
+        return [function(key) for key in keys]
+
+    # Offsets of each key within the joined buffer
+    lengths = np.fromiter(map(len, keys), dtype=np.int64, count=len(keys))
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+
+    # hash_function_2 weights each character by its 1-based position in its key
+    if function is hash_function_2:
+        codes *= np.arange(1, codes.size + 1) - np.repeat(starts, lengths)
+
+    sums = np.concatenate(([0], np.cumsum(codes)))
+    return (sums[ends] - sums[starts]).tolist()
+
+
+# Below this many keys of a batch, _hash_fnv1a_batch hashes the rest one by one
+_FNV1A_BATCH_MIN = 32
+
+
+def _hash_fnv1a_batch(keys: list) -> list:
+    """
+    hash_fnv1a over a batch with NumPy. Keys are sorted longest first, so the
+    keys at least j + 1 bytes long are a prefix and step j folds byte j into
+    just that prefix: the work is proportional to the total number of bytes.
+    uint64 arithmetic wraps like the & _MASK64. Once fewer than
+    _FNV1A_BATCH_MIN keys are left, their remaining bytes are folded in one
+    key at a time, so a single long key does not cost one NumPy step per byte.
+    """
+    try:
+        data = [key.encode() for key in keys]
+    except AttributeError:
+        return [hash_fnv1a(key) for key in keys]
+
+    lengths = np.fromiter(map(len, data), dtype=np.int64, count=len(data))
+    starts = np.cumsum(lengths) - lengths
+    buffer = np.frombuffer(b''.join(data), dtype=np.uint8)
+
+    order = np.argsort(-lengths, kind='stable')
+    starts = starts[order]
+    # longer[j] is the number of keys longer than j bytes
+    longer = np.searchsorted(-lengths[order], -np.arange(int(lengths.max(initial=0))), side='left')
+
+    hashes = np.full(len(data), 0xCBF29CE484222325, dtype=np.uint64)
+    prime = np.uint64(0x100000001B3)
+    for j, count in enumerate(longer.tolist()):
+        if count < _FNV1A_BATCH_MIN:
+            # The few keys still going finish byte by byte from their partial hashes
+            for i in range(count):
+                hash = int(hashes[i])
+                for byte in data[order[i]][j:]:
+                    hash = (hash ^ byte) * 0x100000001B3 & _MASK64
+                hashes[i] = hash
+            break
+        hashes[:count] = (hashes[:count] ^ buffer[starts[:count] + j]) * prime
+
+    result = np.empty_like(hashes)
+    result[order] = hashes
+    return result.tolist()
+
+
+# Snapshot file header: magic, format version, map kind, capacity, size, hash function name length
+SNAPSHOT_MAGIC = b'HMSNAP\x00\x01'
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct('<8sH2sQQH')
+
+# Hash functions a snapshot may name; any other function has to be passed to load()
+SNAPSHOT_HASH_FUNCTIONS = {function.__name__: function for function in
+                           (hash_function_1, hash_function_2, hash_fnv1a, hash_mix64)}
+
+# Builtins an untrusted snapshot may rebuild; every other global is refused
+_SNAPSHOT_SAFE_GLOBALS = {('builtins', 'complex'), ('builtins', 'set'),
+                          ('builtins', 'frozenset'), ('builtins', 'bytearray')}
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    """
+    Unpickler for untrusted snapshots and memory-mapped map values. Plain
+    values (numbers, strings, bytes, lists, tuples, dicts, ...) load as usual,
+    but no class or callable can be looked up, so loading cannot run code.
+    """
+
+    def find_class(self, module: str, name: str) -> object:
+        """Allow only the builtins in _SNAPSHOT_SAFE_GLOBALS."""
+        if (module, name) not in _SNAPSHOT_SAFE_GLOBALS:
+            raise ValueError(f"pickled data needs {module}.{name}; "
+                             f"only load it with trusted=True if it comes from a trusted source")
+        return super().find_class(module, name)
+
+
+def unpickle(data: bytes, trusted: bool = False) -> object:
+    """
+    Return the object pickled in data. Unless trusted, only plain builtin
+    values are accepted (ValueError otherwise), since unpickling arbitrary
+    objects can run arbitrary code.
+    """
+    if trusted:
+        return pickle.loads(data)
+    return _SnapshotUnpickler(io.BytesIO(data)).load()
+
+
+def write_snapshot(path: str, kind: str, capacity: int, size: int,
+                   function: callable, options: dict, payload: tuple) -> None:
+    """
+    Write a versioned binary HashMap snapshot. The header records the map kind,
+    capacity, size and hash function name; the constructor options and the
+    slot payload (typically parallel lists of indices, hashes, keys and values)
+    follow as a single pickle.
+    """
+    name = function.__name__.encode('utf-8')
+    with open(path, 'wb') as file:
+        file.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, kind.encode('ascii'),
+                                         capacity, size, len(name)))
+        file.write(name)
+        pickle.dump((options, payload), file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def read_snapshot(path: str, kind: str, function: callable = None, trusted: bool = False) -> tuple:
+    """
+    Read a snapshot written by write_snapshot for the given map kind and return
+    (capacity, size, function, options, payload). Unless a function is passed,
+    the hash function is looked up by its recorded name in SNAPSHOT_HASH_FUNCTIONS.
+
+    The body is a pickle, and unpickling arbitrary objects can run arbitrary code.
+    By default only plain builtin values are accepted (ValueError otherwise);
+    trusted=True lifts that restriction and must only be used for snapshots
+    that come from a trusted source.
+    """
+    with open(path, 'rb') as file:
+        magic, version, stored_kind, capacity, size, name_length = _SNAPSHOT_HEADER.unpack(
+            file.read(_SNAPSHOT_HEADER.size))
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} is not a version {SNAPSHOT_VERSION} HashMap snapshot")
+        if stored_kind.decode('ascii') != kind:
+            raise ValueError(f"{path} holds a {stored_kind.decode('ascii')} map, not {kind}")
+
+        name = file.read(name_length).decode('utf-8')
+        if function is None:
+            function = SNAPSHOT_HASH_FUNCTIONS.get(name)
+            if function is None:
+                raise ValueError(f"unknown hash function {name}; pass it to load()")
+
+        options, payload = pickle.load(file) if trusted else _SnapshotUnpickler(file).load()
+    return capacity, size, function, options, payload
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -92,11 +448,15 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    # Fixed attributes instead of a per-node __dict__ keep each node small
+    __slots__ = ('key', 'value', 'next', 'hash')
+
+    def __init__(self, key: str, value: object, next: "SLNode" = None, hash: int = None) -> None:
+        """Initialize node given a key, value and optionally the key's full hash."""
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -130,7 +490,7 @@ class LinkedListIterator:
 class LinkedList:
     """
     Class implementing a Singly Linked List
-    Supported methods are: insert, remove, contains, length, iterator
+    Supported methods are: insert, insert_node, remove, detach, contains, length, iterator
     """
 
     def __init__(self) -> None:
@@ -157,53 +517,180 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
-        """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+    def insert(self, key: str, value: object, hash: int = None) -> None:
+        """Insert new node at front of the list, caching the key's hash if given."""
+        self._head = SLNode(key, value, self._head, hash)
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def insert_node(self, node: SLNode) -> None:
+        """Link an existing node in at the front of the list."""
+        node.next = self._head
+        self._head = node
+        self._size += 1
+
+    def remove(self, key: str, hash: int = None) -> bool:
         """
         Remove first node with matching key.
+        If hash is given, cached hashes are compared before keys.
         Return True if removal was successful, False otherwise.
         """
+        return self.detach(key, hash) is not None
+
+    def detach(self, key: str, hash: int = None) -> SLNode:
+        """
+        Unlink first node with matching key and return it, or None if no match.
+        If hash is given, cached hashes are compared before keys.
+        """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
                     self._head = node.next
                 self._size -= 1
-                return True
+                return node
 
             previous, node = node, node.next
-        return False
+        return None
+
+    def contains(self, key: str, hash: int = None, reorder: str = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        If hash is given, cached hashes are compared before keys.
+        reorder 'move_to_front' moves a matching node to the head of the list,
+        'transpose' swaps it with the node before it, in the same traversal.
+        """
+        if reorder is not None:
+            return self._contains_reorder(key, hash, reorder)
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
         node = self._head
+        if hash is None:
+            while node:
+                if node.key == key:
+                    return node
+                node = node.next
+            return node
+
         while node:
-            if node.key == key:
+            if node.hash == hash and node.key == key:
                 return node
             node = node.next
         return node
 
+    def _contains_reorder(self, key: str, hash: int, reorder: str) -> SLNode:
+        """Return node with matching key, or None, relinking it closer to the head."""
+        before, previous, node = None, None, self._head
+        while node:
+
+            if (hash is None or node.hash == hash) and node.key == key:
+                if previous:
+                    previous.next = node.next
+                    if reorder == 'move_to_front':
+                        node.next = self._head
+                        self._head = node
+                    else:
+                        node.next = previous
+                        if before:
+                            before.next = node
+                        else:
+                            self._head = node
+                return node
+
+            before, previous, node = previous, node, node.next
+        return None
+
     def length(self) -> int:
         """Return the length of the list."""
         return self._size
 
 
+class SortedBucket:
+    """
+    Bucket keeping its nodes in a list sorted by (hash, key), searched with bisect,
+    so lookups in a long chain take O(log n) comparisons.
+    Supports the same methods as LinkedList, so a hash map can swap one for the other:
+    insert, insert_node, remove, detach, contains, length, iterator
+    """
+
+    def __init__(self, nodes=()) -> None:
+        """Initialize the bucket with the given nodes, which must carry their hashes."""
+        self._nodes = sorted(nodes, key=lambda node: (node.hash, node.key))
+        self._keys = [(node.hash, node.key) for node in self._nodes]
+        for node in self._nodes:
+            node.next = None
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return 'SB [' + ' -> '.join(str(node) for node in self._nodes) + ']'
+
+    def __iter__(self):
+        """Return an iterator over the nodes, in (hash, key) order."""
+        return iter(self._nodes)
+
+    def insert(self, key: str, value: object, hash: int) -> None:
+        """Insert new node at its sorted position."""
+        self.insert_node(SLNode(key, value, None, hash))
+
+    def insert_node(self, node: SLNode) -> None:
+        """Insert an existing node at its sorted position."""
+        node.next = None
+        index = bisect_left(self._keys, (node.hash, node.key))
+        self._keys.insert(index, (node.hash, node.key))
+        self._nodes.insert(index, node)
+
+    def remove(self, key: str, hash: int) -> bool:
+        """
+        Remove node with matching key and hash.
+        Return True if removal was successful, False otherwise.
+        """
+        return self.detach(key, hash) is not None
+
+    def detach(self, key: str, hash: int) -> SLNode:
+        """Remove node with matching key and hash and return it, or None if no match."""
+        index = bisect_left(self._keys, (hash, key))
+        if index < len(self._keys) and self._keys[index] == (hash, key):
+            del self._keys[index]
+            return self._nodes.pop(index)
+        return None
+
+    def contains(self, key: str, hash: int = None, reorder: str = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        Without a hash every node is scanned. reorder is accepted for
+        compatibility with LinkedList and ignored, as the order is fixed.
+        """
+        if hash is None:
+            for node in self._nodes:
+                if node.key == key:
+                    return node
+            return None
+
+        index = bisect_left(self._keys, (hash, key))
+        if index < len(self._keys) and self._keys[index] == (hash, key):
+            return self._nodes[index]
+        return None
+
+    def length(self) -> int:
+        """Return the number of nodes in the bucket."""
+        return len(self._nodes)
+
+
 # ---------- For use in Open Addressing (OA) HashMap  ---------- #
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
+    __slots__ = ('key', 'value', 'hash', 'is_tombstone')
+
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
         """Initialize an entry for use in a hash map."""
         self.key = key
         self.value = value
 
+        # Full hash of the key, reused on resize and compared before keys
+        self.hash = hash
+
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
 
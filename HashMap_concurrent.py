@@ -0,0 +1,372 @@
+# Name: Arman Manukyan
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap
+# Description: Thread-safe lock-striped SC (Separate Chaining) HashMap.
+
+import threading
+
+from DynamicArray_LinkedList import (DynamicArray, LinkedList,
+                        hash_function_1, hash_function_2, is_prime, next_prime)
+
+
+class HashMap:
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 stripes: int = 16) -> None:
+        """
+        Initialize new thread-safe HashMap that uses separate chaining for
+        collision resolution. Bucket i is guarded by lock i % stripes, so
+        writers to different stripes never wait on each other. Reads take no
+        lock: nodes are only ever published whole, values are replaced by a
+        single attribute assignment, and resizing builds a fresh table of new
+        nodes before swapping it in.
+        """
+        self._locks = tuple(threading.Lock() for _ in range(stripes))
+
+        # Keys per stripe, each only updated while holding that stripe's lock
+        self._stripe_sizes = [0] * stripes
+
+        # (buckets, capacity) is replaced as one object, so a reader never
+        # pairs the buckets of one table with the capacity of another
+        self._table = self._new_table(next_prime(capacity))
+
+        self._hash_function = function
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        buckets, capacity = self._table
+        out = ''
+        for i in range(capacity):
+            out += str(i) + ': ' + str(buckets[i]) + '\n'
+        return out
+
+    @staticmethod
+    def _new_table(capacity: int) -> tuple:
+        """
+        Return a (buckets, capacity) table of empty buckets, built in one bulk
+        extend since _rebuild and clear call it while holding every stripe lock
+        """
+        buckets = DynamicArray()
+        buckets.extend([LinkedList() for _ in range(capacity)])
+        return buckets, capacity
+
+    def _lock_bucket(self, hash: int) -> tuple:
+        """
+        Acquire the stripe lock of the bucket for the given hash and return
+        (table, index, stripe). Retries if the table was resized while waiting.
+        """
+        while True:
+            table = self._table
+            index = hash % table[1]
+            stripe = index % len(self._locks)
+            self._locks[stripe].acquire()
+            if self._table is table:
+                return table, index, stripe
+            self._locks[stripe].release()
+
+    def _lock_all(self) -> None:
+        """
+        Acquire every stripe lock, always in the same order
+        """
+        for lock in self._locks:
+            lock.acquire()
+
+    def _unlock_all(self) -> None:
+        """
+        Release every stripe lock
+        """
+        for lock in reversed(self._locks):
+            lock.release()
+
+    def _rebuild(self, new_capacity: int) -> None:
+        """
+        Move every entry into a new table of the given capacity.
+        Must be called with all stripe locks held.
+        """
+        old_buckets, old_capacity = self._table
+        buckets, capacity = table = self._new_table(new_capacity)
+        stripe_sizes = [0] * len(self._locks)
+
+        # New nodes are created so readers still walking the old table see unchanged chains
+        for i in range(old_capacity):
+            for node in old_buckets[i]:
+                index = node.hash % capacity
+                buckets[index].insert(node.key, node.value, node.hash)
+                stripe_sizes[index % len(self._locks)] += 1
+
+        self._stripe_sizes = stripe_sizes
+        self._table = table
+
+    def _grow(self, table: tuple) -> None:
+        """
+        Double the capacity, unless another thread already resized the given table
+        """
+        self._lock_all()
+        try:
+            if self._table is table and self.get_size() >= table[1]:
+                self._rebuild(next_prime(table[1] * 2))
+        finally:
+            self._unlock_all()
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return sum(self._stripe_sizes)
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._table[1]
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Creates or updates the key/value pair in the hash map.
+
+        :param key: string
+        :param value: any object
+
+        :return: None
+        """
+        self.compute(key, lambda _key, _old: value)
+
+    def put_if_absent(self, key: str, value: object) -> object:
+        """
+        Atomically adds the key/value pair if the key is not in the hash map.
+
+        :param key: string
+        :param value: any object
+
+        :return: the existing value, or None if the pair was added
+        """
+        hash = self._hash_function(key)
+        table, index, stripe = self._lock_bucket(hash)
+        try:
+            bucket = table[0][index]
+            node = bucket.contains(key, hash)
+            if node:
+                return node.value
+            bucket.insert(key, value, hash)
+            self._stripe_sizes[stripe] += 1
+        finally:
+            self._locks[stripe].release()
+
+        if self.get_size() >= table[1]:
+            self._grow(table)
+        return None
+
+    def compute(self, key: str, function: callable) -> object:
+        """
+        Atomically replaces the key's value with function(key, current value),
+        where the current value is None for a missing key.
+        If the function returns None the key is removed.
+
+        :param key: string
+        :param function: callable taking (key, value) and returning the new value
+
+        :return: the new value
+        """
+        hash = self._hash_function(key)
+        table, index, stripe = self._lock_bucket(hash)
+        added = False
+        try:
+            bucket = table[0][index]
+            node = bucket.contains(key, hash)
+            value = function(key, node.value if node else None)
+
+            if value is None:
+                if node and bucket.remove(key, hash):
+                    self._stripe_sizes[stripe] -= 1
+            elif node:
+                node.value = value
+            else:
+                bucket.insert(key, value, hash)
+                self._stripe_sizes[stripe] += 1
+                added = True
+        finally:
+            self._locks[stripe].release()
+
+        if added and self.get_size() >= table[1]:
+            self._grow(table)
+        return value
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table.
+
+        :param: None
+
+        :return: integer, empty buckets
+        """
+        buckets, capacity = self._table
+        count = 0
+        for i in range(0, capacity):
+            if buckets[i].length() == 0:
+                count += 1
+        return count
+
+    def table_load(self) -> float:
+        """
+        Returns the current hash table load factor.
+
+        :param: None
+
+        :return: float, load factor
+        """
+        return self.get_size() / self.get_capacity()
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map.
+
+        :param: None
+
+        :return: None
+        """
+        self._lock_all()
+        try:
+            self._table = self._new_table(self._table[1])
+            self._stripe_sizes = [0] * len(self._locks)
+        finally:
+            self._unlock_all()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table.
+        All stripes are held while the entries are moved.
+
+        :param new_capacity: integer
+
+        :return: None
+        """
+        if new_capacity >= 1:
+            if not is_prime(new_capacity):
+                new_capacity = next_prime(new_capacity)
+
+            self._lock_all()
+            try:
+                # Double until the load is below 1, like repeated puts would
+                while self.get_size() >= new_capacity:
+                    new_capacity = next_prime(new_capacity * 2)
+                self._rebuild(new_capacity)
+            finally:
+                self._unlock_all()
+
+    def get(self, key: str):
+        """
+        Returns the value associated with the given key, without locking.
+
+        :param key: string
+
+        :return: any object or None
+        """
+        hash = self._hash_function(key)
+        buckets, capacity = self._table
+        node = buckets[hash % capacity].contains(key, hash)
+        if node:
+            return node.value
+        else:
+            return None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map,
+        or False if the key is not in the hash map. Does not lock.
+
+        :param key: string
+
+        :return: bool
+        """
+        hash = self._hash_function(key)
+        buckets, capacity = self._table
+        if buckets[hash % capacity].contains(key, hash):
+            return True
+        else:
+            return False
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+
+        :param key: string
+
+        :return: None
+        """
+        hash = self._hash_function(key)
+        table, index, stripe = self._lock_bucket(hash)
+        try:
+            if table[0][index].remove(key, hash):
+                self._stripe_sizes[stripe] -= 1
+        finally:
+            self._locks[stripe].release()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value pair,
+        taken as a consistent snapshot with all stripes held.
+
+        :param: None
+
+        :return: DynamicArray
+        """
+        self._lock_all()
+        try:
+            buckets, capacity = self._table
+            returnArr = DynamicArray()
+            for i in range(0, capacity):
+                for node in buckets[i]:
+                    returnArr.append((node.key, node.value))
+        finally:
+            self._unlock_all()
+        return returnArr
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput example 1")
+    print("-------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nstress example 1")
+    print("----------------")
+    # Threads race on shared counters, on a single put_if_absent key and on
+    # their own keys, while the table grows underneath them
+    threads, rounds = 8, 2000
+    m = HashMap(11, hash_function_2)
+    winners = []
+
+    def worker(number):
+        if m.put_if_absent('winner', number) is None:
+            winners.append(number)
+        for i in range(rounds):
+            m.compute('counter' + str(i % 10), lambda key, value: (value or 0) + 1)
+            m.put('t' + str(number) + '-' + str(i), i)
+            if i % 2:
+                m.remove('t' + str(number) + '-' + str(i - 1))
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    result = len(winners) == 1 and m.get('winner') == winners[0]
+    for i in range(10):
+        result &= m.get('counter' + str(i)) == threads * rounds // 10
+    for number in range(threads):
+        for i in range(rounds):
+            result &= m.contains_key('t' + str(number) + '-' + str(i)) == (i % 2 == 1)
+    expected = 1 + 10 + threads * rounds // 2
+    print(result, m.get_size() == expected, m.get_keys_and_values().length() == expected)
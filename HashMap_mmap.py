@@ -0,0 +1,500 @@
+# Name: Arman Manukyan
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap
+# Description: Persistent, memory-mapped OA (Open Addressing) HashMap.
+
+import mmap
+import os
+import pickle
+import struct
+
+from DynamicArray_LinkedList import (DynamicArray, hash_function_1, hash_function_2,
+                        is_prime, next_prime, unpickle)
+
+# File layout: header | slot table | append-only heap of key and value records
+_MAGIC = b'HMAPOA\x00\x01'
+_VERSION = 2
+# magic, version, slot size, capacity, size, tombstones, heap end, offset of the hash function name
+_HEADER = struct.Struct('<8sIIQQQQQ')
+_HEADER_SIZE = 64
+_SLOT = struct.Struct('<QQQB7x')        # cached hash, key offset, value offset, state
+_RECORD = struct.Struct('<I')           # length prefix of every heap record
+
+# Slot states
+_EMPTY = 0
+_FULL = 1
+_TOMBSTONE = 2
+
+_MASK64 = (1 << 64) - 1
+
+
+class HashMap:
+    def __init__(self,
+                 path: str,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 readonly: bool = False,
+                 trusted: bool = False) -> None:
+        """
+        Open the file-backed HashMap at path, creating it with the given
+        capacity if it does not exist. The slot table is memory-mapped, so
+        opening an existing map only maps the file instead of re-inserting
+        every entry, and several processes opening it read-only share the
+        same pages of the OS cache. Keys are stored as UTF-8 and values are
+        pickled into an append-only heap after the slot table.
+
+        The file records the name of the hash function that built it, and
+        opening it with a function of another name raises ValueError.
+        Since unpickling arbitrary objects can run arbitrary code, values are
+        read back as plain builtin values only (ValueError otherwise), unless
+        trusted is True; only pass it for files from a trusted source.
+        """
+        self._path = path
+        self._hash_function = function
+        self._readonly = readonly
+        self._trusted = trusted
+
+        if not os.path.exists(path):
+            if readonly:
+                raise FileNotFoundError(path)
+            self._write_file(path, next_prime(capacity), [], function.__name__)
+
+        self._open()
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            hash, key_offset, value_offset, state = self._slot(i)
+            if state == _EMPTY:
+                slot = None
+            else:
+                slot = (f"K: {self._read_key(key_offset)} V: {self._read_value(value_offset)} "
+                        f"TS: {state == _TOMBSTONE}")
+            out += str(i) + ': ' + str(slot) + '\n'
+        return out
+
+    def __enter__(self) -> "HashMap":
+        """Allow the map to be used as a context manager that closes its file."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the map when leaving a with block."""
+        self.close()
+
+    # ----------------------------- file access ------------------------ #
+
+    def _open(self) -> None:
+        """
+        Open and map the file at self._path, reading its header
+        """
+        self._file = open(self._path, 'rb' if self._readonly else 'r+b')
+        self._fd = self._file.fileno()
+
+        header = os.pread(self._fd, _HEADER.size, 0)
+        magic, version, slot_size, capacity, size, tombstones, heap_end, name_offset = (
+            _HEADER.unpack(header))
+        if magic != _MAGIC or version != _VERSION or slot_size != _SLOT.size:
+            self._file.close()
+            raise ValueError(f"{self._path} is not a version {_VERSION} memory-mapped HashMap")
+
+        # Lookups with another hash function would silently miss every key
+        name = self._read_record(name_offset).decode('utf-8')
+        if name != self._hash_function.__name__:
+            self._file.close()
+            raise ValueError(f"{self._path} was built with hash function {name}, "
+                             f"not {self._hash_function.__name__}")
+
+        self._capacity = capacity
+        self._size = size
+        self._tombstones = tombstones
+        self._heap_end = heap_end
+        self._name_offset = name_offset
+        self._map = mmap.mmap(self._fd, _HEADER_SIZE + capacity * _SLOT.size,
+                              access=mmap.ACCESS_READ if self._readonly else mmap.ACCESS_WRITE)
+
+    def close(self) -> None:
+        """
+        Flush pending writes and close the underlying file
+        """
+        if self._map is not None:
+            if not self._readonly:
+                self._map.flush()
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+    def flush(self) -> None:
+        """
+        Write all changes through to the file on disk
+        """
+        self._map.flush()
+        os.fsync(self._fd)
+
+    def _check_writable(self) -> None:
+        """
+        Raise if the map was opened read-only
+        """
+        if self._readonly:
+            raise PermissionError(f"{self._path} is open read-only")
+
+    def _write_header(self) -> None:
+        """
+        Store the current counters in the mapped header
+        """
+        _HEADER.pack_into(self._map, 0, _MAGIC, _VERSION, _SLOT.size, self._capacity,
+                          self._size, self._tombstones, self._heap_end, self._name_offset)
+
+    def _slot(self, index: int) -> tuple:
+        """
+        Return (hash, key offset, value offset, state) of the slot at index
+        """
+        return _SLOT.unpack_from(self._map, _HEADER_SIZE + index * _SLOT.size)
+
+    def _set_slot(self, index: int, hash: int, key_offset: int, value_offset: int, state: int) -> None:
+        """
+        Overwrite the slot at index
+        """
+        _SLOT.pack_into(self._map, _HEADER_SIZE + index * _SLOT.size,
+                        hash, key_offset, value_offset, state)
+
+    def _read_record(self, offset: int) -> bytes:
+        """
+        Return the bytes of the heap record at offset
+        """
+        length, = _RECORD.unpack(os.pread(self._fd, _RECORD.size, offset))
+        return os.pread(self._fd, length, offset + _RECORD.size)
+
+    def _read_key(self, offset: int) -> str:
+        """
+        Return the key stored at the given heap offset
+        """
+        return self._read_record(offset).decode('utf-8')
+
+    def _read_value(self, offset: int) -> object:
+        """
+        Return the value stored at the given heap offset
+        """
+        return unpickle(self._read_record(offset), self._trusted)
+
+    def _append_record(self, data: bytes) -> int:
+        """
+        Append a record to the heap and return its offset
+        """
+        offset = self._heap_end
+        os.pwrite(self._fd, _RECORD.pack(len(data)) + data, offset)
+        self._heap_end += _RECORD.size + len(data)
+        return offset
+
+    @staticmethod
+    def _write_file(path: str, capacity: int, records, function_name: str) -> None:
+        """
+        Write a complete map file holding the (hash, key bytes, value bytes) records
+        yielded by records. Keys must be unique, so each record goes straight into the
+        first free slot of its probe sequence. The heap is streamed to disk as it is
+        built, after a record naming the hash function; only the slot table is
+        assembled in memory.
+        """
+        table_end = _HEADER_SIZE + capacity * _SLOT.size
+        slots = bytearray(capacity * _SLOT.size)
+        name = function_name.encode('utf-8')
+        heap_end = table_end + _RECORD.size + len(name)
+        size = 0
+
+        with open(path, 'wb') as file:
+            file.seek(table_end)
+            file.write(_RECORD.pack(len(name)) + name)
+            for hash, key, value in records:
+                index = hash % capacity
+                k = 0
+                while slots[index * _SLOT.size + 24] != _EMPTY:
+                    k += 1
+                    index = (hash + k * k) % capacity
+
+                key_offset = heap_end
+                value_offset = key_offset + _RECORD.size + len(key)
+                file.write(_RECORD.pack(len(key)) + key + _RECORD.pack(len(value)) + value)
+                heap_end = value_offset + _RECORD.size + len(value)
+                _SLOT.pack_into(slots, index * _SLOT.size, hash, key_offset, value_offset, _FULL)
+                size += 1
+
+            header = bytearray(_HEADER_SIZE)
+            _HEADER.pack_into(header, 0, _MAGIC, _VERSION, _SLOT.size, capacity, size, 0, heap_end,
+                              table_end)
+            file.seek(0)
+            file.write(header)
+            file.write(slots)
+            file.flush()
+            os.fsync(file.fileno())
+
+    # ------------------------------------------------------------------ #
+
+    def _find(self, key: str, hash: int) -> int:
+        """
+        Return the slot index holding the given key, or -1 if it is absent
+        """
+        capacity = self._capacity
+        index = hash % capacity
+        k = 0
+        while k <= capacity // 2:
+            slot_hash, key_offset, _, state = self._slot(index)
+            if state == _EMPTY:
+                return -1
+            if state == _FULL and slot_hash == hash and self._read_key(key_offset) == key:
+                return index
+
+            k += 1
+            index = (hash + k * k) % capacity
+
+        return -1
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Creates or updates the key/value pair in the hash map.
+        Updated values are appended to the heap; the old record is
+        reclaimed the next time the table is rewritten.
+
+        :param key: string
+        :param value: any object
+
+        :return: None
+        """
+        self._check_writable()
+
+        # Double the capacity if size >= capacity / 2,
+        # or rewrite in place once tombstones fill half the table
+        if self.table_load() >= 0.5:
+            self.resize_table(self._capacity * 2)
+        elif (self._size + self._tombstones) / self._capacity >= 0.5:
+            self.resize_table(self._capacity)
+
+        hash = self._hash_function(key) & _MASK64
+        capacity = self._capacity
+        index = hash % capacity
+        target = -1
+        k = 0
+        while k <= capacity // 2:
+            slot_hash, key_offset, _, state = self._slot(index)
+            if state == _EMPTY:
+                break
+
+            # Update in place if the key already exists
+            if state == _FULL:
+                if slot_hash == hash and self._read_key(key_offset) == key:
+                    value_offset = self._append_record(pickle.dumps(value))
+                    self._set_slot(index, hash, key_offset, value_offset, _FULL)
+                    self._write_header()
+                    return
+
+            # Remember the first tombstone, but keep probing for the key
+            elif target == -1:
+                target = index
+
+            k += 1
+            index = (hash + k * k) % capacity
+
+        if target == -1:
+            # Every reachable slot is taken; grow and try again
+            if k > capacity // 2:
+                self.resize_table(capacity * 2)
+                self.put(key, value)
+                return
+            target = index
+        else:
+            self._tombstones -= 1
+
+        key_offset = self._append_record(key.encode('utf-8'))
+        value_offset = self._append_record(pickle.dumps(value))
+        self._set_slot(target, hash, key_offset, value_offset, _FULL)
+        self._size += 1
+        self._write_header()
+
+    def table_load(self) -> float:
+        """
+        Returns the current hash table load factor.
+
+        :param: None
+
+        :return: float, load factor
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table.
+
+        :param: None
+
+        :return: integer, empty buckets
+        """
+        return self._capacity - self._size - self._tombstones
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table.
+        The live entries and their heap records are written to a new file,
+        which then atomically replaces the current one.
+
+        :param new_capacity: integer
+
+        :return: None
+        """
+        self._check_writable()
+        if new_capacity < self._size:
+            return
+
+        if not is_prime(new_capacity):
+            new_capacity = next_prime(new_capacity)
+
+        # Keep at most half the slots full so every probe finds an empty slot
+        while self._size / new_capacity > 0.5:
+            new_capacity = next_prime(new_capacity * 2)
+
+        # Records are copied as raw bytes; nothing is rehashed or unpickled
+        def records():
+            for i in range(self._capacity):
+                hash, key_offset, value_offset, state = self._slot(i)
+                if state == _FULL:
+                    yield hash, self._read_record(key_offset), self._read_record(value_offset)
+
+        self._rewrite(new_capacity, records())
+
+    def _rewrite(self, capacity: int, records: list) -> None:
+        """
+        Write a new file with the given records and swap it in for the current one
+        """
+        temp_path = self._path + '.resize'
+        self._write_file(temp_path, capacity, records, self._hash_function.__name__)
+        self.close()
+        os.replace(temp_path, self._path)
+        self._open()
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key.
+
+        :param key: string
+
+        :return: any object
+        """
+        index = self._find(key, self._hash_function(key) & _MASK64)
+        if index == -1:
+            return None
+        return self._read_value(self._slot(index)[2])
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map,
+        or False if the key is not in the hash map.
+
+        :param key: string
+
+        :return: bool
+        """
+        return self._find(key, self._hash_function(key) & _MASK64) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+
+        :param key: string
+
+        :return: None
+        """
+        self._check_writable()
+        hash = self._hash_function(key) & _MASK64
+        index = self._find(key, hash)
+        if index != -1:
+            self._set_slot(index, hash, 0, 0, _TOMBSTONE)
+            self._size -= 1
+            self._tombstones += 1
+            self._write_header()
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map.
+
+        :param: None
+
+        :return: None
+        """
+        self._check_writable()
+        self._rewrite(self._capacity, [])
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value pair.
+
+        :param: None
+
+        :return: DynamicArray
+        """
+        returnArr = DynamicArray()
+        for i in range(self._capacity):
+            _, key_offset, value_offset, state = self._slot(i)
+            if state == _FULL:
+                returnArr.append((self._read_key(key_offset), self._read_value(value_offset)))
+        return returnArr
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'example.hmap')
+
+        print("\nput example 1")
+        print("-------------")
+        with HashMap(path, 53, hash_function_1) as m:
+            for i in range(150):
+                m.put('str' + str(i), i * 100)
+                if i % 25 == 24:
+                    print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+        print("\nreopen example 1")
+        print("----------------")
+        with HashMap(path, function=hash_function_1, readonly=True) as m:
+            result = True
+            for i in range(150):
+                result &= m.get('str' + str(i)) == i * 100
+            print(result, m.get_size(), m.get_capacity(), m.contains_key('str150'))
+
+        print("\nremove example 1")
+        print("----------------")
+        with HashMap(path, function=hash_function_1) as m:
+            for i in range(0, 150, 2):
+                m.remove('str' + str(i))
+            m.put('str1', {'updated': True})
+            m.resize_table(100)
+            print(m.get_size(), m.get_capacity(), m.get('str0'), m.get('str1'), m.get('str3'))
+
+        print("\nreopen example 2")
+        print("----------------")
+        try:
+            HashMap(path, function=hash_function_2)
+        except ValueError as error:
+            print(str(error).replace(directory + os.sep, ''))
+        with HashMap(path, function=hash_function_1) as m:
+            m.put('array', DynamicArray([1, 2, 3]))
+            try:
+                m.get('array')
+            except ValueError as error:
+                print(error)
+        with HashMap(path, function=hash_function_1, trusted=True) as m:
+            print(m.get('array'), m.get('str1'))
@@ -3,65 +3,161 @@
 # Assignment: Assignment 6 - HashMap
 # Description: Implementation of an SC (Separate Chaining) and OA (Open Addressing) HashMap.
 
+import os
+import tempfile
+import time
 from DynamicArray_LinkedList import (DynamicArray, DynamicArrayException, HashEntry,
-                        hash_function_1, hash_function_2)
+                        hash_function_1, hash_function_2, hash_many,
+                        fmix64, is_prime, next_prime,
+                        read_snapshot, write_snapshot)
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    # Increase in the probe step after every probe, per strategy
+    _PROBE_GROWTH = {'linear': 0, 'quadratic': 2, 'triangular': 1, 'double': 0}
+
+    def __init__(self,
+                 capacity: int,
+                 function,
+                 probing: str = 'quadratic',
+                 load_factor: float = 0.5,
+                 capacity_policy: str = 'prime',
+                 shrink_load: float = 0,
+                 node_pool: bool = False) -> None:
         """
-        Initialize new HashMap that uses
-        quadratic probing for collision resolution
+        Initialize new HashMap that uses open addressing for collision resolution.
+
+        probing selects the collision strategy:
+        'linear' probes hash, hash + 1, hash + 2, ...
+        'quadratic' probes hash + k ** 2,
+        'triangular' probes hash + k * (k + 1) / 2,
+        'double' steps by a second hash of the key (hash_function_2 when the
+        primary function is hash_function_1, otherwise a multiplicative remix
+        of the primary hash),
+        'robin_hood' probes linearly, keeps entries ordered by their displacement
+        from their home slot, and removes by shifting the cluster back,
+        so it never leaves tombstones.
+        All other strategies mark removed entries as tombstones.
+
+        The table doubles once the load reaches load_factor, which may be at
+        most 0.5 with quadratic or triangular probing (they only reach half of
+        a prime table) and at most 0.95 otherwise.
+
+        capacity_policy 'prime' keeps a prime number of slots and indexes by
+        hash % capacity. 'pow2' keeps a power-of-two number of slots and
+        indexes by masking the low bits of the hash, after running it
+        through a 64-bit finalizer so those bits are well mixed. Quadratic
+        probing cycles on a power-of-two table, so 'pow2' probes triangular
+        numbers instead, which visit every slot, and double hashing uses an
+        odd step.
+
+        Once removals drop the load below shrink_load (0 never shrinks), the
+        table shrinks so the load is back at 2 * shrink_load, dropping every
+        tombstone, but never below the initial capacity. shrink_load may be at
+        most a quarter of load_factor, so at least twice as many keys must be
+        added again before the table grows back.
+
+        With node_pool, entries dropped by clear, resize_table and Robin Hood
+        removal, or whose tombstone is overwritten, are kept on a free-list
+        (at most one per slot) and reused by later puts instead of allocating new ones.
+        This saves allocations, not time: churn with and without it runs
+        equally fast (benchmark.py memory).
         """
-        self._buckets = DynamicArray()
-
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        if probing not in self._PROBE_GROWTH and probing != 'robin_hood':
+            raise ValueError(f"unknown probing strategy: {probing}")
+        half_table = probing in ('quadratic', 'triangular')
+        if not 0 < load_factor <= (0.5 if half_table else 0.95):
+            raise ValueError(f"load factor {load_factor} is not supported with {probing} probing")
+        if capacity_policy not in ('prime', 'pow2'):
+            raise ValueError(f"unknown capacity policy: {capacity_policy}")
+        if not 0 <= shrink_load <= load_factor / 4:
+            raise ValueError(f"shrink load {shrink_load} must be between 0 and {load_factor / 4}")
+
+        self._probing = probing
+        self._robin_hood = probing == 'robin_hood'
+        self._load_factor = load_factor
+        self._capacity_policy = capacity_policy
+        self._pow2 = capacity_policy == 'pow2'
+        self._shrink_load = shrink_load
+        self._free_entries = [] if node_pool else None
+
+        # Probes take step, step + growth, step + 2 * growth, ... slots
+        # and can reach every slot unless only half the table is covered
+        self._probe_growth = self._PROBE_GROWTH.get(probing, 0)
+        self._half_table = half_table and not self._pow2
+        if self._pow2 and probing == 'quadratic':
+            self._probe_growth = self._PROBE_GROWTH['triangular']
+
+        # capacity must be a prime number, or a power of two with 'pow2'
+        self._capacity = self._next_capacity(capacity)
+        self._mask = self._capacity - 1
+        self._min_capacity = self._capacity
+        self._buckets = self._new_buckets(self._capacity)
 
         self._hash_function = function
         self._size = 0
+        self._tombstones = 0
+
+        # Statistics kept up to date by every operation, see stats().
+        # _probe_lengths[n] counts probe sequences that stepped n slots past the home slot
+        self._empty = self._capacity
+        self._probe_lengths = [0]
+        self._hits = 0
+        self._misses = 0
+        self._resizes = 0
+        self._resize_time = 0.0
 
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
         """
         out = ''
-        for i in range(self._buckets.length()):
-            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+        for i, entry in enumerate(self._buckets):
+            out += str(i) + ': ' + str(entry) + '\n'
         return out
 
-    def _next_prime(self, capacity: int) -> int:
+    @staticmethod
+    def _new_buckets(capacity: int) -> DynamicArray:
         """
-        Increment from given number to find the closest prime number
+        Return a table of capacity empty slots, filled in one bulk operation
         """
-        if capacity % 2 == 0:
-            capacity += 1
+        buckets = DynamicArray()
+        buckets.fill(capacity, None)
+        return buckets
 
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
-
-    @staticmethod
-    def _is_prime(capacity: int) -> bool:
+    def _next_capacity(self, capacity: int) -> int:
         """
-        Determine if given integer is a prime number and return boolean
+        Return the closest capacity allowed by the capacity policy, at least the given one
         """
-        if capacity == 2 or capacity == 3:
-            return True
+        if self._pow2:
+            return max(2, 1 << (capacity - 1).bit_length())
+        return next_prime(capacity)
 
-        if capacity == 1 or capacity % 2 == 0:
-            return False
+    def _valid_capacity(self, capacity: int) -> bool:
+        """
+        Determine if the given capacity is allowed by the capacity policy
+        """
+        if self._pow2:
+            return capacity >= 2 and capacity & (capacity - 1) == 0
+        return is_prime(capacity)
 
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
+    def _hash(self, key: str) -> int:
+        """
+        Return the hash of the key, finalized in 'pow2' mode
+        so the low bits used as the index depend on every bit
+        """
+        if self._pow2:
+            return fmix64(self._hash_function(key))
+        return self._hash_function(key)
 
-        return True
+    def _hash_batch(self, keys: list) -> list:
+        """
+        Return the hashes of a batch of keys, finalized in 'pow2' mode
+        """
+        hashes = hash_many(keys, self._hash_function)
+        if self._pow2:
+            return [fmix64(hash) for hash in hashes]
+        return hashes
 
     def get_size(self) -> int:
         """
@@ -75,6 +171,104 @@ class HashMap:
         """
         return self._capacity
 
+    def _probe_step(self, key: str, hash: int) -> int:
+        """
+        Return the first probe step for the key under the configured strategy
+        """
+        if self._probing != 'double' or self._capacity < 3:
+            return 1
+        if self._hash_function is hash_function_1:
+            secondary = hash_function_2(key)
+        else:
+            # Fibonacci hashing spreads small hashes over the whole step range
+            secondary = (hash * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF) >> 32
+        if self._pow2:
+            # Any odd step is coprime with a power-of-two capacity
+            return secondary % self._capacity | 1
+        return 1 + secondary % (self._capacity - 1)
+
+    def _probe_limit(self) -> int:
+        """
+        Return the number of steps after which a probe sequence starts repeating slots
+        """
+        if self._half_table:
+            return self._capacity // 2
+        return self._capacity - 1
+
+    def _new_entry(self, key: str, value: object, hash: int) -> HashEntry:
+        """
+        Return an entry for the key/value pair, reusing a pooled entry if one is free
+        """
+        free = self._free_entries
+        if free:
+            entry = free.pop()
+            entry.key, entry.value, entry.hash = key, value, hash
+            entry.is_tombstone = False
+            return entry
+        return HashEntry(key, value, hash)
+
+    def _release(self, entry: HashEntry) -> None:
+        """
+        Return an entry that left the table to the free-list, if pooling is on
+        """
+        free = self._free_entries
+        if free is not None and len(free) < self._capacity:
+            entry.key = entry.value = None
+            free.append(entry)
+
+    def _record_probe(self, length: int) -> None:
+        """
+        Count one probe sequence that stepped the given number of slots past the home slot
+        """
+        counts = self._probe_lengths
+        while length >= len(counts):
+            counts.append(0)
+        counts[length] += 1
+
+    def _find(self, key: str, hash: int) -> int:
+        """
+        Return the slot index holding the given key, or -1 if it is absent
+        """
+        if self._robin_hood:
+            return self._robin_hood_find(key, hash)
+
+        found, index, k, _ = self._probe(key, hash)
+        self._record_probe(k)
+        return index if found else -1
+
+    def _probe(self, key: str, hash: int) -> tuple:
+        """
+        Follow the key's probe sequence (any strategy but Robin Hood) until it
+        reaches the key, an empty slot, or starts repeating slots. Return
+        (found, index, k, tombstone): whether the key was found, the slot the
+        walk stopped at, the number of steps taken and the first tombstone
+        passed on the way (-1 if none)
+        """
+        capacity = self._capacity
+        index = hash & self._mask if self._pow2 else hash % capacity
+        step, growth = self._probe_step(key, hash), self._probe_growth
+        limit = self._probe_limit()
+        buckets = self._buckets.raw()
+        tombstone = -1
+
+        # Stop once the sequence starts repeating slots, even without an empty slot
+        k = 0
+        entry = buckets[index]
+        while entry is not None and k <= limit:
+            # Remember the first tombstone, but keep probing in case the key is further along
+            if entry.is_tombstone:
+                if tombstone == -1:
+                    tombstone = index
+            elif entry.hash == hash and entry.key == key:
+                return True, index, k, tombstone
+
+            k += 1
+            index = (index + step) % capacity
+            step += growth
+            entry = buckets[index]
+
+        return False, index, k, tombstone
+
     # ------------------------------------------------------------------ #
 
     def put(self, key: str, value: object) -> None:
@@ -86,32 +280,200 @@ class HashMap:
 
         :return: None
         """
-        # Double the capacity if size >= capacity
-        if self.table_load() >= 0.5:
+        self._put(key, value, self._hash(key))
+
+    def _make_room(self) -> None:
+        """
+        Grow the table, or purge its tombstones, before a key may be added
+        """
+        # Double the capacity if size >= capacity * load factor,
+        # always leaving at least one empty slot to end probe sequences
+        if self.table_load() >= self._load_factor or self._size + 1 >= self._capacity:
             self.resize_table(self._capacity * 2)
 
-        hash = self._hash_function(key)
-        index = hash % self._capacity
+        # Rehash in place once tombstones push the occupied slots past the
+        # load factor, so they stop lengthening every probe sequence
+        elif (self._size + self._tombstones) / self._capacity >= self._load_factor:
+            self.resize_table(self._capacity)
+
+    def _put(self, key: str, value: object, hash: int) -> None:
+        """
+        Creates or updates the key/value pair given the key's precomputed hash
+        """
+        self._make_room()
+        self._place(key, value, hash)
+
+    def _place(self, key: str, value: object, hash: int) -> None:
+        """
+        Creates or updates the key/value pair given its precomputed hash,
+        once the table has room for it
+        """
+        if self._robin_hood:
+            self._robin_hood_put(key, value, hash)
+            return
+
+        found, index, k, target = self._probe(key, hash)
+        buckets = self._buckets.raw()
+
+        # Update the value in place if the key already exists
+        if found:
+            buckets[index].value = value
+            self._record_probe(k)
+            return
+
+        if target == -1:
+            # Every reachable slot is taken; grow and try again
+            if buckets[index] is not None:
+                self.resize_table(self._capacity * 2)
+                self._put(key, value, hash)
+                return
+            target = index
+            self._empty -= 1
+        else:
+            self._tombstones -= 1
+            self._release(buckets[target])
+
+        # Add the new key/value pair
+        buckets[target] = self._new_entry(key, value, hash)
+        self._size += 1
+        self._record_probe(k)
+
+    def _put_new(self, key: str, value: object, hash: int) -> None:
+        """
+        Adds a key known to be absent given its precomputed hash,
+        taking the first free slot without comparing any keys
+        """
+        self._make_room()
+
+        if self._robin_hood:
+            self._robin_hood_put(key, value, hash)
+            return
+
+        capacity = self._capacity
+        index = hash & self._mask if self._pow2 else hash % capacity
+        step, growth = self._probe_step(key, hash), self._probe_growth
+        limit = self._probe_limit()
+        buckets = self._buckets.raw()
+
         k = 0
-        while self._buckets[index] is not None:
-            # Stops function if index is not a tombstone and index already contains the key
-            if self._buckets[index].key == key and not self._buckets[index].is_tombstone:
-                self._buckets[index].value = value
+        entry = buckets[index]
+        while entry is not None and not entry.is_tombstone:
+            k += 1
+            if k > limit:
+                # Every reachable slot is taken; grow and try again
+                self.resize_table(capacity * 2)
+                self._put_new(key, value, hash)
                 return
+            index = (index + step) % capacity
+            step += growth
+            entry = buckets[index]
+
+        if entry is None:
+            self._empty -= 1
+        else:
+            self._tombstones -= 1
+            self._release(entry)
+        buckets[index] = self._new_entry(key, value, hash)
+        self._size += 1
+        self._record_probe(k)
+
+    def _shrink_if_sparse(self) -> None:
+        """
+        Shrink the table once removals drop the load below shrink_load
+        """
+        if self._size < self._capacity * self._shrink_load and self._capacity > self._min_capacity:
+            new_capacity = self._next_capacity(
+                max(self._min_capacity, int(self._size / (2 * self._shrink_load))))
+            if new_capacity < self._capacity:
+                self.resize_table(new_capacity)
 
-            # Updates the key/value pair and stops the function if the index is the tombstone
-            elif self._buckets[index].is_tombstone:
-                self._buckets[index] = HashEntry(key, value)
-                self._size += 1
+    def _robin_hood_find(self, key: str, hash: int) -> int:
+        """
+        Return the slot index holding the given key under Robin Hood probing,
+        or -1 if it is absent
+        """
+        capacity = self._capacity
+        index = hash % capacity
+        buckets = self._buckets.raw()
+        distance = 0
+        while buckets[index] is not None:
+            entry = buckets[index]
+
+            # Entries closer to home than the probe distance mean the key would
+            # have displaced them on insert, so it cannot be further along
+            if (index - entry.hash % capacity) % capacity < distance:
+                break
+
+            if entry.hash == hash and entry.key == key:
+                self._record_probe(distance)
+                return index
+
+            distance += 1
+            index = (index + 1) % capacity
+
+        self._record_probe(distance)
+        return -1
+
+    def _robin_hood_put(self, key: str, value: object, hash: int) -> None:
+        """
+        Creates or updates the key/value pair under Robin Hood probing,
+        displacing entries that sit closer to their home slot than the one being placed
+        """
+        capacity = self._capacity
+        index = hash % capacity
+        distance = 0
+        buckets = self._buckets.raw()
+        carried = None
+        k = 0
+        while buckets[index] is not None:
+            entry = buckets[index]
+
+            # The new key may still exist until it has displaced another entry
+            if carried is None and entry.hash == hash and entry.key == key:
+                entry.value = value
+                self._record_probe(k)
                 return
 
-            # Next iteration
+            entry_distance = (index - entry.hash % capacity) % capacity
+            if entry_distance < distance:
+                if carried is None:
+                    carried = self._new_entry(key, value, hash)
+                    self._size += 1
+                buckets[index] = carried
+                carried, distance = entry, entry_distance
+
             k += 1
-            index = (hash + (k ** 2)) % self._capacity
+            distance += 1
+            index = (index + 1) % capacity
 
-        # Add the new key/value pair
-        self._buckets[index] = HashEntry(key, value)
-        self._size += 1
+        if carried is None:
+            carried = self._new_entry(key, value, hash)
+            self._size += 1
+        buckets[index] = carried
+        self._empty -= 1
+        self._record_probe(k)
+
+    def _robin_hood_remove(self, key: str, hash: int) -> None:
+        """
+        Removes the given key under Robin Hood probing by shifting the rest of
+        its cluster back one slot instead of leaving a tombstone
+        """
+        index = self._robin_hood_find(key, hash)
+        if index == -1:
+            return
+
+        capacity = self._capacity
+        buckets = self._buckets.raw()
+        self._release(buckets[index])
+        following = (index + 1) % capacity
+        while (buckets[following] is not None
+               and buckets[following].hash % capacity != following):
+            buckets[index] = buckets[following]
+            index, following = following, (following + 1) % capacity
+
+        buckets[index] = None
+        self._empty += 1
+        self._size -= 1
 
     def table_load(self) -> float:
         """
@@ -131,11 +493,7 @@ class HashMap:
 
         :return: integer, empty buckets
         """
-        count = 0
-        for i in range(0, self._capacity):
-            if self._buckets[i] is None:
-                count += 1
-        return count
+        return self._empty
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -146,20 +504,37 @@ class HashMap:
         :return: None
         """
         if new_capacity >= self._size:
-            if not self._is_prime(new_capacity):
-                new_capacity = self._next_prime(new_capacity)
+            start = time.perf_counter()
+            if not self._valid_capacity(new_capacity):
+                new_capacity = self._next_capacity(new_capacity)
 
             # Creates a temporary hash map
-            tempMap = HashMap(new_capacity, self._hash_function)
-
-            # Fills the temp hash map with current hash map values
-            for i in range(0, self._capacity):
-                if self._buckets[i] is not None and not self._buckets[i].is_tombstone:
-                    tempMap.put(self._buckets[i].key, self._buckets[i].value)
+            tempMap = HashMap(new_capacity, self._hash_function, self._probing,
+                              self._load_factor, self._capacity_policy)
+            tempMap._free_entries = self._free_entries
+
+            # Fills the temp hash map with current hash map values, reusing the cached hashes.
+            # Keys are already unique, so each one takes the first free slot.
+            for entry in self._buckets:
+                if entry is not None:
+                    key, value, hash = entry.key, entry.value, entry.hash
+                    self._release(entry)
+                    if not entry.is_tombstone:
+                        tempMap._put_new(key, value, hash)
 
             # Updates the current hash map to the temp hash map
             self._capacity = tempMap._capacity
+            self._mask = tempMap._mask
             self._buckets = tempMap._buckets
+            self._tombstones = 0
+            self._empty = tempMap._empty
+
+            # A smaller table keeps a smaller free-list
+            if self._free_entries is not None:
+                del self._free_entries[self._capacity:]
+
+            self._resizes += 1
+            self._resize_time += time.perf_counter() - start
 
     def get(self, key: str) -> object:
         """
@@ -169,17 +544,18 @@ class HashMap:
 
         :return: any object
         """
-        hash = self._hash_function(key)
-        index = hash % self._capacity
-        k = 0
-        while self._buckets[index] is not None:
-            if self._buckets[index].key == key and not self._buckets[index].is_tombstone:
-                return self._buckets[index].value
-
-            k += 1
-            index = (hash + (k ** 2)) % self._capacity
+        return self._get(key, self._hash(key))
 
-        return None
+    def _get(self, key: str, hash: int) -> object:
+        """
+        Returns the value associated with the given key and its precomputed hash
+        """
+        index = self._find(key, hash)
+        if index == -1:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return self._buckets[index].value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -190,17 +566,11 @@ class HashMap:
 
         :return: bool
         """
-        hash = self._hash_function(key)
-        index = hash % self._capacity
-        k = 0
-        while self._buckets[index] is not None:
-            if self._buckets[index].key == key and not self._buckets[index].is_tombstone:
-                return True
-
-            k += 1
-            index = (hash + (k ** 2)) % self._capacity
-
-        return False
+        if self._find(key, self._hash(key)) == -1:
+            self._misses += 1
+            return False
+        self._hits += 1
+        return True
 
     def remove(self, key: str) -> None:
         """
@@ -210,28 +580,46 @@ class HashMap:
 
         :return: None
         """
-        hash = self._hash_function(key)
-        index = hash % self._capacity
-        k = 0
-        while self._buckets[index] is not None:
-            if self._buckets[index].key == key and not self._buckets[index].is_tombstone:
-                self._buckets[index].is_tombstone = True
-                self._size -= 1
-            k += 1
-            index = (hash + (k ** 2)) % self._capacity
+        self._remove(key, self._hash(key))
+        self._shrink_if_sparse()
+
+    def _remove(self, key: str, hash: int) -> None:
+        """
+        Removes the given key, given its precomputed hash
+        """
+        if self._robin_hood:
+            self._robin_hood_remove(key, hash)
+            return
 
-    def clear(self) -> None:
+        index = self._find(key, hash)
+        if index != -1:
+            self._buckets[index].is_tombstone = True
+            self._size -= 1
+            self._tombstones += 1
+
+    def clear(self, release: bool = False) -> None:
         """
         Clears the contents of the hash map.
 
-        :param: None
+        :param release: bool, also shrink the table back to its initial capacity
 
         :return: None
         """
-        self._buckets = DynamicArray()
+        if self._free_entries is not None:
+            for entry in self._buckets:
+                if entry is not None:
+                    self._release(entry)
+
+        if release:
+            self._capacity = self._min_capacity
+            self._mask = self._capacity - 1
+            if self._free_entries is not None:
+                del self._free_entries[self._capacity:]
+
+        self._buckets = self._new_buckets(self._capacity)
         self._size = 0
-        for i in range(0, self._capacity):
-            self._buckets.append(None)
+        self._tombstones = 0
+        self._empty = self._capacity
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -242,12 +630,205 @@ class HashMap:
         :return: DynamicArray
         """
         returnArr = DynamicArray()
-        for i in range(0, self._capacity):
-            if self._buckets[i] is not None:
-                if not self._buckets[i].is_tombstone:
-                    returnArr.append((self._buckets[i].key, self._buckets[i].value))
+        for entry in self._buckets:
+            if entry is not None:
+                if not entry.is_tombstone:
+                    returnArr.append((entry.key, entry.value))
         return returnArr
 
+    def stats(self) -> dict:
+        """
+        Returns counters that every operation keeps up to date, so this is O(longest probe).
+
+        :param: None
+
+        :return: dict with size, capacity, load, empty_buckets, tombstones,
+                 probe_lengths (number of lookups and puts that stepped 0, 1, 2, ...
+                 slots past the home slot), resizes, resize_seconds,
+                 and hits and misses of get and contains_key
+        """
+        return {
+            'size': self._size,
+            'capacity': self._capacity,
+            'load': self.table_load(),
+            'empty_buckets': self._empty,
+            'tombstones': self._tombstones,
+            'probe_lengths': list(self._probe_lengths),
+            'resizes': self._resizes,
+            'resize_seconds': self._resize_time,
+            'hits': self._hits,
+            'misses': self._misses,
+        }
+
+    def dump(self, path: str) -> None:
+        """
+        Writes a binary snapshot of the hash map to the given path,
+        including each entry's slot index, cached hash and tombstone flag.
+
+        :param path: string, file path
+
+        :return: None
+        """
+        indices, hashes, keys, values, tombstones = [], [], [], [], []
+        for i, entry in enumerate(self._buckets):
+            if entry is not None:
+                indices.append(i)
+                hashes.append(entry.hash)
+                keys.append(entry.key)
+                values.append(entry.value)
+                tombstones.append(entry.is_tombstone)
+
+        write_snapshot(path, 'oa', self._capacity, self._size, self._hash_function,
+                       {'probing': self._probing, 'load_factor': self._load_factor,
+                        'capacity_policy': self._capacity_policy,
+                        'shrink_load': self._shrink_load,
+                        'node_pool': self._free_entries is not None,
+                        'min_capacity': self._min_capacity},
+                       (indices, hashes, keys, values, tombstones))
+
+    @classmethod
+    def load(cls, path: str, function: callable = None, trusted: bool = False) -> "HashMap":
+        """
+        Returns a hash map restored from a snapshot written by dump.
+        Entries and tombstones go straight back into their recorded slots,
+        so nothing is rehashed or probed.
+
+        :param path: string, file path
+        :param function: hash function, if it is not one defined in DynamicArray_LinkedList
+        :param trusted: boolean, allow values of any type; snapshots are pickles, so only
+                        pass True for files from a trusted source
+
+        :return: HashMap
+        """
+        capacity, size, function, options, payload = read_snapshot(path, 'oa', function, trusted)
+        indices, hashes, keys, values, tombstones = payload
+        min_capacity = options.pop('min_capacity', capacity)
+
+        map = cls(capacity, function, **options)
+        map._min_capacity = min_capacity
+
+        # resize_table can leave a capacity (2) that the constructor would round up
+        if map._capacity != capacity:
+            map._buckets = cls._new_buckets(capacity)
+            map._capacity = capacity
+            map._mask = capacity - 1
+
+        for i in range(len(keys)):
+            entry = HashEntry(keys[i], values[i], hashes[i])
+            entry.is_tombstone = tombstones[i]
+            map._buckets[indices[i]] = entry
+        map._size = size
+        map._tombstones = sum(tombstones)
+        map._empty = capacity - len(keys)
+        return map
+
+    @staticmethod
+    def _capacity_for(count: int, load_factor: float) -> int:
+        """
+        Return the smallest capacity that holds count keys without growing
+        """
+        # put grows once size reaches capacity * load factor or leaves no empty slot
+        return max(count + 1, int((count - 1) / load_factor) + 1)
+
+    def reserve(self, count: int) -> None:
+        """
+        Grows the table at most once, so that it holds count keys in total
+        without resizing again.
+
+        :param count: integer, number of keys
+
+        :return: None
+        """
+        capacity = self._capacity_for(count, self._load_factor)
+        if capacity > self._capacity:
+            self.resize_table(capacity)
+
+    @classmethod
+    def from_pairs(cls, pairs, function, n_hint: int = None,
+                   unique: bool = False, **options) -> "HashMap":
+        """
+        Returns a new hash map holding the given key/value pairs. The map is
+        created at its final capacity, so it never resizes while being filled.
+        With unique, keys are trusted to be distinct and each one takes the
+        first free slot without comparing keys along the probe.
+
+        :param pairs: DynamicArray or iterable of (key, value) tuples
+        :param function: hash function
+        :param n_hint: integer, expected number of pairs, so a stream of pairs
+                       is added as it is read instead of collected first
+        :param unique: bool, True if no key appears twice
+        :param options: any other constructor arguments
+
+        :return: HashMap
+        """
+        if n_hint is None or isinstance(pairs, DynamicArray):
+            pairs = list(pairs)
+        if n_hint is None:
+            n_hint = len(pairs)
+
+        capacity = cls._capacity_for(n_hint, options.get('load_factor', 0.5))
+        map = cls(capacity, function, **options)
+        add = map._put_new if unique else map._put
+
+        if isinstance(pairs, list):
+            hashes = map._hash_batch([pair[0] for pair in pairs])
+            for i in range(len(pairs)):
+                add(pairs[i][0], pairs[i][1], hashes[i])
+        else:
+            for key, value in pairs:
+                add(key, value, map._hash(key))
+        return map
+
+    def put_many(self, pairs) -> None:
+        """
+        Creates or updates every key/value pair in a batch.
+        Every key is hashed up front and the table is resized at most once,
+        for the final count, so no put needs its own load check.
+
+        :param pairs: DynamicArray or iterable of (key, value) tuples
+
+        :return: None
+        """
+        pairs = list(pairs)
+        hashes = self._hash_batch([pair[0] for pair in pairs])
+
+        # Size the table for the whole batch, counting tombstones as occupied,
+        # so no put below would grow or purge it and the load check is skipped
+        count = self._size + len(pairs)
+        if self._capacity < self._capacity_for(count + self._tombstones, self._load_factor):
+            self.resize_table(max(self._capacity, self._capacity_for(count, self._load_factor)))
+
+        for i in range(len(pairs)):
+            self._place(pairs[i][0], pairs[i][1], hashes[i])
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns the values associated with a batch of keys, in input order.
+        Missing keys map to None. Every key is hashed up front.
+
+        :param keys: DynamicArray or iterable of strings
+
+        :return: DynamicArray
+        """
+        keys = list(keys)
+        hashes = self._hash_batch(keys)
+        return DynamicArray([self._get(keys[i], hashes[i]) for i in range(len(keys))])
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes a batch of keys and their associated values from the hash map.
+
+        :param keys: DynamicArray or iterable of strings
+
+        :return: None
+        """
+        keys = list(keys)
+        hashes = self._hash_batch(keys)
+
+        for i in range(len(keys)):
+            self._remove(keys[i], hashes[i])
+        self._shrink_if_sparse()
+
     def __iter__(self):
         """
         Enables the hash map to iterate across itself.
@@ -488,3 +1069,96 @@ if __name__ == "__main__":
     print(m)
     for item in m:
         print('K:', item.key, 'V:', item.value)
+
+    print("\nbulk example 1")
+    print("--------------")
+    m = HashMap(11, hash_function_2)
+    m.put_many(('key' + str(i), i * 10) for i in range(100))
+    print(m.get_size(), m.get_capacity())
+    m.remove_many(DynamicArray(['key' + str(i) for i in range(0, 100, 2)]))
+    print(m.get_size(), m.get_many(['key0', 'key1', 'key2', 'key3', 'key99']))
+
+    print("\nrobin hood example 1")
+    print("--------------------")
+    m = HashMap(11, hash_function_2, 'robin_hood', 0.9)
+    for i in range(200):
+        m.put('key' + str(i), i)
+    for i in range(0, 200, 2):
+        m.remove('key' + str(i))
+    result = True
+    for i in range(200):
+        result &= m.get('key' + str(i)) == (i if i % 2 else None)
+    print(result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\ndump/load example 1")
+    print("-------------------")
+    path = os.path.join(tempfile.mkdtemp(), 'map.snap')
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 30):
+        m.put('key' + str(i), i * 10)
+    m.remove('key7')
+    m.dump(path)
+    loaded = HashMap.load(path)
+    print(loaded.get_size(), loaded.get_capacity(), loaded.get('key3'), loaded.get('key7'))
+    print(str(loaded) == str(m))
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+
+    print("\nstats example 1")
+    print("---------------")
+    m = HashMap(11, hash_function_1)
+    for i in range(100):
+        m.put('str' + str(i), i)
+    for i in range(0, 200, 2):
+        m.get('str' + str(i))
+    m.remove('str0')
+    stats = m.stats()
+    print(stats['size'], stats['capacity'], stats['empty_buckets'], stats['resizes'],
+          stats['hits'], stats['misses'])
+    print(stats['probe_lengths'])
+
+    print("\ncapacity policy example 1")
+    print("-------------------------")
+    for policy in ('prime', 'pow2'):
+        m = HashMap(11, hash_function_2, 'quadratic', 0.5, policy)
+        for i in range(150):
+            m.put('str' + str(i), i * 100)
+        result = True
+        for i in range(150):
+            result &= m.get('str' + str(i)) == i * 100
+        print(policy, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nshrink example 1")
+    print("----------------")
+    m = HashMap(11, hash_function_2, shrink_load=0.125)
+    for i in range(1000):
+        m.put('str' + str(i), i)
+    print(m.get_size(), m.get_capacity())
+    for i in range(950):
+        m.remove('str' + str(i))
+    print(m.get_size(), m.get_capacity(), m.get('str999'))
+    m.clear(release=True)
+    print(m.get_size(), m.get_capacity())
+
+    print("\nfrom_pairs example 1")
+    print("--------------------")
+    pairs = [('str' + str(i), i) for i in range(1000)]
+    m = HashMap.from_pairs(pairs, hash_function_2, unique=True)
+    print(m.get_size(), m.get_capacity(), m.get('str999'), m.stats()['resizes'])
+    m = HashMap(11, hash_function_2)
+    m.reserve(1000)
+    capacity = m.get_capacity()
+    for key, value in pairs:
+        m.put(key, value)
+    print(m.get_size(), m.get_capacity() == capacity, m.stats()['resizes'])
+
+    print("\nnode pool example 1")
+    print("-------------------")
+    m = HashMap(11, hash_function_2, node_pool=True)
+    for i in range(100):
+        m.put('str' + str(i), i)
+    for i in range(50):
+        m.remove('str' + str(i))
+    for i in range(50):
+        m.put('new' + str(i), i)
+    print(m.get_size(), m.get('str99'), m.get('new49'), m.get('str0'))
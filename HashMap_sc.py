@@ -3,67 +3,171 @@
 # Assignment: Assignment 6 - HashMap
 # Description: Implementation of an SC (Separate Chaining) and OA (Open Addressing) HashMap.
 
-from DynamicArray_LinkedList import (DynamicArray, LinkedList,
-                        hash_function_1, hash_function_2)
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from DynamicArray_LinkedList import (DynamicArray, LinkedList, SLNode, SortedBucket,
+                        hash_function_1, hash_function_2, hash_many,
+                        fmix64, is_prime, next_prime,
+                        read_snapshot, write_snapshot)
 
 
 class HashMap:
+    # Number of old buckets moved into the new table per operation
+    # while an incremental resize is in progress
+    _MIGRATE_BUCKETS = 4
+
+    # Default treeify_length with the 'insertion' chain policy
+    _TREEIFY_LENGTH = 8
+
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 incremental_resize: bool = False,
+                 capacity_policy: str = 'prime',
+                 shrink_load: float = 0,
+                 node_pool: bool = False,
+                 chain_policy: str = 'insertion',
+                 treeify_length: int = None) -> None:
         """
         Initialize new HashMap that uses
-        separate chaining for collision resolution
+        separate chaining for collision resolution.
+        With incremental_resize, growth triggered by put migrates the old
+        buckets a few at a time instead of rehashing the whole table at once.
+
+        capacity_policy 'prime' keeps a prime number of buckets and indexes by
+        hash % capacity. 'pow2' keeps a power-of-two number of buckets and
+        indexes by masking the low bits of the hash, after running it
+        through a 64-bit finalizer so those bits are well mixed.
+
+        Once removals drop the load below shrink_load (0 never shrinks), the
+        table shrinks so the load is back at 2 * shrink_load, but never below
+        the initial capacity. The shrink happens in one step, even with
+        incremental_resize. shrink_load may be at most a quarter of the
+        growth load of 1, so at least twice as many keys must be added again
+        before the table grows back.
+
+        With node_pool, nodes released by remove, clear and resize_table are
+        kept on a free-list (at most one per bucket) and reused by later puts
+        instead of allocating new ones. This saves allocations, not time:
+        churn with and without it runs equally fast (benchmark.py memory).
+
+        chain_policy 'insertion' leaves chains in insertion order. On every
+        lookup hit, 'move_to_front' moves the key's node to the head of its
+        chain and 'transpose' swaps it one step towards the head, so
+        frequently accessed keys are found after fewer nodes on skewed workloads.
+
+        A chain that grows to treeify_length keys (e.g. anagrams under
+        hash_function_1) is converted into a SortedBucket searched by bisection
+        on (hash, key), bounding lookups in it to O(log n), and back into a
+        LinkedList once it shrinks below treeify_length - 2 keys. 0 never
+        converts chains. By default (None) it is 8 with the 'insertion' chain
+        policy and 0 with the others, so reordering applies to every chain.
+        If both are set, treeified buckets take precedence: they keep
+        (hash, key) order and are not reordered by lookups.
         """
-        self._buckets = DynamicArray()
-
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+        if capacity_policy not in ('prime', 'pow2'):
+            raise ValueError(f"unknown capacity policy: {capacity_policy}")
+        if chain_policy not in ('insertion', 'move_to_front', 'transpose'):
+            raise ValueError(f"unknown chain policy: {chain_policy}")
+        if treeify_length is None:
+            treeify_length = self._TREEIFY_LENGTH if chain_policy == 'insertion' else 0
+        if treeify_length != 0 and treeify_length < 3:
+            raise ValueError(f"treeify length {treeify_length} must be 0 or at least 3")
+        if not 0 <= shrink_load <= 0.25:
+            raise ValueError(f"shrink load {shrink_load} must be between 0 and 0.25")
+        self._capacity_policy = capacity_policy
+        self._pow2 = capacity_policy == 'pow2'
+        self._shrink_load = shrink_load
+        self._free_nodes = [] if node_pool else None
+        self._chain_policy = chain_policy
+        self._reorder = None if chain_policy == 'insertion' else chain_policy
+
+        # A chain reaching _treeify_length keys becomes a SortedBucket, and turns
+        # back into a LinkedList once it drops below _untreeify_length keys
+        self._treeify_length = treeify_length
+        self._untreeify_length = treeify_length - 2
+
+        # capacity must be a prime number, or a power of two with 'pow2'
+        self._capacity = self._next_capacity(capacity)
+        self._mask = self._capacity - 1
+        self._min_capacity = self._capacity
+        self._buckets = self._new_buckets(self._capacity)
 
         self._hash_function = function
         self._size = 0
 
+        # Old table kept alongside the new one while an incremental resize runs;
+        # old buckets below _migrate_index have already been moved, and new
+        # buckets below _allocate_index have been created
+        self._incremental_resize = incremental_resize
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+        self._allocate_index = 0
+
+        # Statistics kept up to date by every operation, see stats().
+        # _chain_lengths[n] is the number of buckets holding n keys
+        self._chain_lengths = [self._capacity]
+        self._hits = 0
+        self._misses = 0
+        self._resizes = 0
+        self._resize_time = 0.0
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
         """
+        self._finish_resize()
         out = ''
-        for i in range(self._buckets.length()):
-            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+        for i, bucket in enumerate(self._buckets):
+            out += str(i) + ': ' + str(bucket) + '\n'
         return out
 
-    def _next_prime(self, capacity: int) -> int:
+    @staticmethod
+    def _new_buckets(capacity: int) -> DynamicArray:
         """
-        Increment from given number and the find the closest prime number
+        Return a table of capacity empty buckets, built in one bulk extend
         """
-        if capacity % 2 == 0:
-            capacity += 1
+        buckets = DynamicArray()
+        buckets.extend([LinkedList() for _ in range(capacity)])
+        return buckets
 
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
-
-    @staticmethod
-    def _is_prime(capacity: int) -> bool:
+    def _next_capacity(self, capacity: int) -> int:
         """
-        Determine if given integer is a prime number and return boolean
+        Return the closest capacity allowed by the capacity policy, at least the given one
         """
-        if capacity == 2 or capacity == 3:
-            return True
+        if self._pow2:
+            return max(2, 1 << (capacity - 1).bit_length())
+        return next_prime(capacity)
 
-        if capacity == 1 or capacity % 2 == 0:
-            return False
+    def _valid_capacity(self, capacity: int) -> bool:
+        """
+        Determine if the given capacity is allowed by the capacity policy
+        """
+        if self._pow2:
+            return capacity >= 2 and capacity & (capacity - 1) == 0
+        return is_prime(capacity)
 
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
+    def _hash(self, key: str) -> int:
+        """
+        Return the hash of the key, finalized in 'pow2' mode
+        so the low bits used as the index depend on every bit
+        """
+        if self._pow2:
+            return fmix64(self._hash_function(key))
+        return self._hash_function(key)
 
-        return True
+    def _hash_batch(self, keys: list) -> list:
+        """
+        Return the hashes of a batch of keys, finalized in 'pow2' mode
+        """
+        hashes = hash_many(keys, self._hash_function)
+        if self._pow2:
+            return [fmix64(hash) for hash in hashes]
+        return hashes
 
     def get_size(self) -> int:
         """
@@ -77,6 +181,121 @@ class HashMap:
         """
         return self._capacity
 
+    def _chain_changed(self, length: int, change: int) -> None:
+        """
+        Move one bucket from the given chain length to length + change in the histogram
+        """
+        counts = self._chain_lengths
+        counts[length] -= 1
+        length += change
+        if length == len(counts):
+            counts.append(1)
+        else:
+            counts[length] += 1
+
+        # Keep the last entry nonzero, so it is always the longest chain
+        while counts[-1] == 0 and len(counts) > 1:
+            counts.pop()
+
+    def _bucket(self, hash: int) -> LinkedList:
+        """
+        Return the bucket that holds, or would hold, a key with the given hash.
+        During an incremental resize, keys whose old bucket has not been
+        migrated yet still live in the old table.
+        """
+        if self._old_buckets is not None:
+            old_index = hash % self._old_capacity
+            if old_index >= self._migrate_index:
+                return self._old_buckets[old_index]
+
+            # New buckets are created on first use while the migration runs
+            index = hash & self._mask if self._pow2 else hash % self._capacity
+            bucket = self._buckets[index]
+            if bucket is None:
+                bucket = self._buckets[index] = LinkedList()
+            return bucket
+        if self._pow2:
+            return self._buckets[hash & self._mask]
+        return self._buckets[hash % self._capacity]
+
+    def _start_resize(self, new_capacity: int) -> None:
+        """
+        Allocate the new table and begin migrating buckets into it incrementally.
+        The new table starts out as empty slots; its buckets are created as
+        keys reach them and by each migration step, so no single operation
+        allocates the whole table.
+        """
+        start = time.perf_counter()
+        new_capacity = self._next_capacity(new_capacity)
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._migrate_index = 0
+        self._allocate_index = 0
+
+        self._buckets = DynamicArray()
+        self._buckets.fill(new_capacity, None)
+        self._capacity = new_capacity
+        self._mask = new_capacity - 1
+
+        # Until migrated, the old buckets stay in the histogram alongside the new ones
+        self._chain_lengths[0] += new_capacity
+        self._resizes += 1
+        self._resize_time += time.perf_counter() - start
+
+    def _migrate(self, count: int) -> None:
+        """
+        Move up to count old buckets into the new table, creating the new
+        table's buckets and releasing the old ones in proportion, and drop
+        the old table once every bucket has been moved
+        """
+        start = time.perf_counter()
+        counts = self._chain_lengths
+        old_buckets, buckets = self._old_buckets.raw(), self._buckets.raw()
+        end = min(self._migrate_index + count, self._old_capacity)
+        for i in range(self._migrate_index, end):
+            old_bucket = old_buckets[i]
+            old_buckets[i] = None
+            counts[old_bucket.length()] -= 1
+
+            # Keys are already unique, so nodes are inserted without a contains check
+            for node in old_bucket:
+                index = node.hash % self._capacity
+                bucket = buckets[index]
+                if bucket is None:
+                    bucket = buckets[index] = LinkedList()
+                self._chain_changed(bucket.length(), 1)
+                key, value, hash = node.key, node.value, node.hash
+                self._release(node)
+                self._insert(bucket, key, value, hash)
+                if (self._treeify_length and bucket.length() >= self._treeify_length
+                        and isinstance(bucket, LinkedList)):
+                    self._treeify(buckets, index)
+        self._migrate_index = end
+
+        # Every new bucket exists by the time the last old one has been moved
+        allocate_end = self._capacity * end // self._old_capacity
+        for index in range(self._allocate_index, allocate_end):
+            if buckets[index] is None:
+                buckets[index] = LinkedList()
+        self._allocate_index = allocate_end
+
+        while counts[-1] == 0 and len(counts) > 1:
+            counts.pop()
+        self._resize_time += time.perf_counter() - start
+
+        if end == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+            self._migrate_index = 0
+
+    def _finish_resize(self) -> None:
+        """
+        Complete any in-progress incremental resize
+        """
+        if self._old_buckets is not None:
+            self._migrate(self._old_capacity)
+
     # ------------------------------------------------------------------ #
 
     def put(self, key: str, value: object) -> None:
@@ -88,22 +307,207 @@ class HashMap:
 
         :return: None
         """
+        self._put(key, value, self._hash(key))
+
+    def _make_room(self) -> None:
+        """
+        Advance an incremental resize, or grow the table if size >= capacity,
+        before a key may be added
+        """
+        if self._old_buckets is not None:
+            self._migrate(self._MIGRATE_BUCKETS)
+
         # Double the capacity if size >= capacity
-        if self.table_load() >= 1:
-            self.resize_table(self._capacity * 2)
+        elif self.table_load() >= 1:
+            if self._incremental_resize:
+                self._start_resize(self._capacity * 2)
+                self._migrate(self._MIGRATE_BUCKETS)
+            else:
+                self.resize_table(self._capacity * 2)
+
+    def _shrink_if_sparse(self) -> None:
+        """
+        Shrink the table once removals drop the load below shrink_load
+        """
+        if (self._size < self._capacity * self._shrink_load
+                and self._capacity > self._min_capacity and self._old_buckets is None):
+            new_capacity = self._next_capacity(
+                max(self._min_capacity, int(self._size / (2 * self._shrink_load))))
+            # Always shrink in one step, even with incremental_resize: the table is
+            # not grown while a migration is pending, so puts during a gradual
+            # shrink would pile into the small new table
+            if new_capacity < self._capacity:
+                self.resize_table(new_capacity)
+
+    def _insert(self, bucket: LinkedList, key: str, value: object, hash: int) -> None:
+        """
+        Insert a node at the front of the bucket, reusing a pooled node if one is free
+        """
+        free = self._free_nodes
+        if free:
+            node = free.pop()
+            node.key, node.value, node.hash = key, value, hash
+            bucket.insert_node(node)
+        else:
+            bucket.insert(key, value, hash)
 
-        # Calculated index of the key
-        index = self._hash_function(key) % self._capacity
+    def _release(self, node: SLNode) -> None:
+        """
+        Return a node that left the table to the free-list, if pooling is on
+        """
+        free = self._free_nodes
+        if free is not None and len(free) < self._capacity:
+            node.key = node.value = node.next = None
+            free.append(node)
 
-        # If the key is not in the HashMap add a new node to the hash table at the index
-        if not self.contains_key(key):
-            self._buckets[index].insert(key, value)
-            self._size += 1
+    def _locate(self, hash: int) -> tuple:
+        """
+        Return (buckets, index) of the bucket that _bucket returns for the given hash,
+        where buckets is the raw list of the table holding it
+        """
+        if self._old_buckets is not None:
+            old_index = hash % self._old_capacity
+            if old_index >= self._migrate_index:
+                return self._old_buckets.raw(), old_index
+        if self._pow2:
+            return self._buckets.raw(), hash & self._mask
+        return self._buckets.raw(), hash % self._capacity
 
-        # If the key already exists replace it with the new node
+    @staticmethod
+    def _treeify(buckets: list, index: int) -> None:
+        """
+        Replace the LinkedList at buckets[index] with a SortedBucket holding its nodes
+        """
+        buckets[index] = SortedBucket(buckets[index])
+
+    @staticmethod
+    def _untreeify(buckets: list, index: int) -> None:
+        """
+        Replace the SortedBucket at buckets[index] with a LinkedList holding its nodes
+        """
+        bucket = LinkedList()
+        for node in reversed(list(buckets[index])):
+            bucket.insert_node(node)
+        buckets[index] = bucket
+
+    def _add(self, bucket: LinkedList, key: str, value: object, hash: int) -> None:
+        """
+        Insert a key known to be absent into the given bucket
+        """
+        length = bucket.length()
+        self._chain_changed(length, 1)
+        self._insert(bucket, key, value, hash)
+        self._size += 1
+        if (self._treeify_length and length + 1 >= self._treeify_length
+                and isinstance(bucket, LinkedList)):
+            self._treeify(*self._locate(hash))
+
+    def _detach(self, bucket: LinkedList, key: str, hash: int) -> bool:
+        """
+        Remove the key from the given bucket and return True if it was there
+        """
+        node = bucket.detach(key, hash)
+        if node is None:
+            return False
+        length = bucket.length()
+        self._chain_changed(length + 1, -1)
+        self._size -= 1
+        self._release(node)
+        if length < self._untreeify_length and isinstance(bucket, SortedBucket):
+            self._untreeify(*self._locate(hash))
+        return True
+
+    def _put(self, key: str, value: object, hash: int) -> None:
+        """
+        Creates or updates the key/value pair given the key's precomputed hash
+        """
+        self._make_room()
+        bucket = self._bucket(hash)
+
+        # Update the value in place if the key already exists,
+        # otherwise add a new node, all in one walk of the chain
+        node = bucket.contains(key, hash, self._reorder)
+        if node:
+            node.value = value
+        else:
+            self._add(bucket, key, value, hash)
+
+    def _put_new(self, key: str, value: object, hash: int) -> None:
+        """
+        Adds a key known to be absent given its precomputed hash, without walking the chain
+        """
+        self._make_room()
+        self._add(self._bucket(hash), key, value, hash)
+
+    def put_if_absent(self, key: str, value: object) -> object:
+        """
+        Adds the key/value pair only if the key is not in the hash map.
+
+        :param key: string
+        :param value: any object
+
+        :return: the existing value, or None if the pair was added
+        """
+        hash = self._hash(key)
+        self._make_room()
+        bucket = self._bucket(hash)
+
+        node = bucket.contains(key, hash, self._reorder)
+        if node:
+            return node.value
+        self._add(bucket, key, value, hash)
+        return None
+
+    def compute(self, key: str, function: callable) -> object:
+        """
+        Replaces the key's value with function(key, current value),
+        where the current value is None for a missing key.
+        If the function returns None the key is removed.
+
+        :param key: string
+        :param function: callable taking (key, value) and returning the new value
+
+        :return: the new value
+        """
+        hash = self._hash(key)
+        self._make_room()
+        bucket = self._bucket(hash)
+
+        node = bucket.contains(key, hash, self._reorder)
+        value = function(key, node.value if node else None)
+        if value is None:
+            if node and self._detach(bucket, key, hash):
+                self._shrink_if_sparse()
+        elif node:
+            node.value = value
         else:
-            self._buckets[index].remove(key)
-            self._buckets[index].insert(key, value)
+            self._add(bucket, key, value, hash)
+        return value
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Adds delta to the key's value, starting a missing key at delta.
+
+        :param key: string
+        :param delta: number to add
+
+        :return: the new value
+        """
+        return self._increment(key, delta, self._hash(key))
+
+    def _increment(self, key: str, delta: int, hash: int) -> int:
+        """
+        Adds delta to the key's value given the key's precomputed hash
+        """
+        self._make_room()
+        bucket = self._bucket(hash)
+
+        node = bucket.contains(key, hash, self._reorder)
+        if node:
+            node.value += delta
+            return node.value
+        self._add(bucket, key, delta, hash)
+        return delta
 
     def empty_buckets(self) -> int:
         """
@@ -113,11 +517,8 @@ class HashMap:
 
         :return: integer, empty buckets
         """
-        count = 0
-        for i in range(0, self._capacity):
-            if self._buckets[i].length() == 0:
-                count += 1
-        return count
+        self._finish_resize()
+        return self._chain_lengths[0]
 
     def table_load(self) -> float:
         """
@@ -129,17 +530,33 @@ class HashMap:
         """
         return self._size / self._capacity
 
-    def clear(self) -> None:
+    def clear(self, release: bool = False) -> None:
         """
         Clears the contents of the hash map.
 
-        :param: None
+        :param release: bool, also shrink the table back to its initial capacity
 
         :return: None
         """
-        for i in range(0, self._capacity):
-            self._buckets[i] = LinkedList()
+        if self._free_nodes is not None:
+            for bucket in self._buckets:
+                # New buckets may not exist yet during an incremental resize
+                if bucket is not None:
+                    for node in bucket:
+                        self._release(node)
+
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+
+        if release:
+            self._capacity = self._min_capacity
+            self._mask = self._capacity - 1
+            if self._free_nodes is not None:
+                del self._free_nodes[self._capacity:]
+        self._buckets = self._new_buckets(self._capacity)
         self._size = 0
+        self._chain_lengths = [self._capacity]
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -150,41 +567,66 @@ class HashMap:
         :return: None
         """
         if new_capacity >= 1:
+            self._finish_resize()
+
+            # A put below may resize again; that time is already inside this one
+            start, resize_time = time.perf_counter(), self._resize_time
+            self._resizes += 1
 
-            if not self._is_prime(new_capacity):
-                new_capacity = self._next_prime(new_capacity)
+            if not self._valid_capacity(new_capacity):
+                new_capacity = self._next_capacity(new_capacity)
 
-            # List of values in the HashMap
-            valuesList = LinkedList()
-            for i in range(0, self._capacity):
-                if self._buckets[i].length() >= 1:
-                    for item in self._buckets[i]:
-                        valuesList.insert(item.key, item.value)
+            # Nodes in the HashMap, in table order
+            nodes = []
+            for bucket in self._buckets:
+                for node in bucket:
+                    nodes.append(node)
 
             # Empty the HashMap and increase the capacity
-            self._buckets = DynamicArray()
-            for i in range(0, new_capacity):
-                self._buckets.append(LinkedList())
+            self._buckets = self._new_buckets(new_capacity)
             self._capacity = new_capacity
+            self._mask = new_capacity - 1
             self._size = 0
+            self._chain_lengths = [new_capacity]
+
+            # Re-add the values back into the HashMap in reverse table order, reusing
+            # the cached hashes. Keys are already unique, so no chain is searched for them.
+            for node in reversed(nodes):
+                key, value, hash = node.key, node.value, node.hash
+                self._release(node)
+                self._put_new(key, value, hash)
 
-            # Re-add the values back into the HashMap
-            for item in valuesList:
-                self.put(item.key, item.value)
+            # A smaller table keeps a smaller free-list
+            if self._free_nodes is not None:
+                del self._free_nodes[self._capacity:]
 
-    def get(self, key: str):
+            self._resize_time = resize_time + time.perf_counter() - start
+
+    def get(self, key: str, default: object = None):
         """
         Returns the value associated with the given key.
 
         :param key: string
+        :param default: value returned if the key is not in the hash map
+
+        :return: any object, or default
+        """
+        return self._get(key, self._hash(key), default)
 
-        :return: any object or None
+    def _get(self, key: str, hash: int, default: object = None):
         """
-        index = self._hash_function(key) % self._capacity
-        if self.contains_key(key):
-            return self._buckets[index].contains(key).value
+        Returns the value associated with the given key and its precomputed hash
+        """
+        if self._old_buckets is not None:
+            self._migrate(self._MIGRATE_BUCKETS)
+
+        node = self._bucket(hash).contains(key, hash, self._reorder)
+        if node:
+            self._hits += 1
+            return node.value
         else:
-            return None
+            self._misses += 1
+            return default
 
     def contains_key(self, key: str) -> bool:
         """
@@ -195,10 +637,12 @@ class HashMap:
 
         :return: bool
         """
-        index = self._hash_function(key) % self._capacity
-        if self._buckets[index].contains(key):
+        hash = self._hash(key)
+        if self._bucket(hash).contains(key, hash, self._reorder):
+            self._hits += 1
             return True
         else:
+            self._misses += 1
             return False
 
     def remove(self, key: str) -> None:
@@ -209,10 +653,12 @@ class HashMap:
 
         :return: None
         """
-        index = self._hash_function(key) % self._capacity
-        if self.contains_key(key):
-            self._buckets[index].remove(key)
-            self._size -= 1
+        if self._old_buckets is not None:
+            self._migrate(self._MIGRATE_BUCKETS)
+
+        hash = self._hash(key)
+        if self._detach(self._bucket(hash), key, hash):
+            self._shrink_if_sparse()
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -222,36 +668,313 @@ class HashMap:
 
         :return: DynamicArray
         """
+        self._finish_resize()
         returnArr = DynamicArray()
-        for i in range(0, self._capacity):
-            for node in self._buckets[i]:
+        for bucket in self._buckets:
+            for node in bucket:
                 returnArr.append((node.key, node.value))
         return returnArr
 
+    def stats(self) -> dict:
+        """
+        Returns counters that every operation keeps up to date, so this is O(longest chain).
+        While an incremental resize runs, the chain lengths cover the buckets of both tables.
+
+        :param: None
+
+        :return: dict with size, capacity, load, empty_buckets,
+                 chain_lengths (number of buckets holding 0, 1, 2, ... keys),
+                 resizes, resize_seconds, and hits and misses of get and contains_key
+        """
+        return {
+            'size': self._size,
+            'capacity': self._capacity,
+            'load': self.table_load(),
+            'empty_buckets': self._chain_lengths[0],
+            'chain_lengths': list(self._chain_lengths),
+            'resizes': self._resizes,
+            'resize_seconds': self._resize_time,
+            'hits': self._hits,
+            'misses': self._misses,
+        }
+
+    def dump(self, path: str) -> None:
+        """
+        Writes a binary snapshot of the hash map to the given path,
+        including each entry's bucket index and cached hash.
+
+        :param path: string, file path
 
-def find_mode(da: DynamicArray) -> (DynamicArray, int):
+        :return: None
+        """
+        self._finish_resize()
+        indices, hashes, keys, values, sorted_buckets = [], [], [], [], []
+        for i, bucket in enumerate(self._buckets):
+            if isinstance(bucket, SortedBucket):
+                sorted_buckets.append(i)
+            for node in bucket:
+                indices.append(i)
+                hashes.append(node.hash)
+                keys.append(node.key)
+                values.append(node.value)
+
+        write_snapshot(path, 'sc', self._capacity, self._size, self._hash_function,
+                       {'incremental_resize': self._incremental_resize,
+                        'capacity_policy': self._capacity_policy,
+                        'chain_policy': self._chain_policy,
+                        'treeify_length': self._treeify_length,
+                        'shrink_load': self._shrink_load,
+                        'node_pool': self._free_nodes is not None,
+                        'min_capacity': self._min_capacity,
+                        'sorted_buckets': sorted_buckets},
+                       (indices, hashes, keys, values))
+
+    @classmethod
+    def load(cls, path: str, function: callable = None, trusted: bool = False) -> "HashMap":
+        """
+        Returns a hash map restored from a snapshot written by dump.
+        Entries go straight back into their recorded buckets, so nothing is rehashed.
+
+        :param path: string, file path
+        :param function: hash function, if it is not one defined in DynamicArray_LinkedList
+        :param trusted: boolean, allow values of any type; snapshots are pickles, so only
+                        pass True for files from a trusted source
+
+        :return: HashMap
+        """
+        capacity, size, function, options, payload = read_snapshot(path, 'sc', function, trusted)
+        indices, hashes, keys, values = payload
+        min_capacity = options.pop('min_capacity', capacity)
+        sorted_buckets = options.pop('sorted_buckets', None)
+
+        map = cls(capacity, function, **options)
+        map._min_capacity = min_capacity
+
+        # resize_table can leave a capacity (2) that the constructor would round up
+        if map._capacity != capacity:
+            map._buckets = cls._new_buckets(capacity)
+            map._capacity = capacity
+            map._mask = capacity - 1
+        map._chain_lengths = [capacity]
+
+        # Chains were written head first, so inserting in reverse restores their order
+        for i in range(len(keys) - 1, -1, -1):
+            bucket = map._buckets[indices[i]]
+            map._chain_changed(bucket.length(), 1)
+            bucket.insert(keys[i], values[i], hashes[i])
+        map._size = size
+
+        # Older snapshots did not record which buckets were sorted
+        buckets = map._buckets.raw()
+        if not map._treeify_length:
+            sorted_buckets = []
+        elif sorted_buckets is None:
+            sorted_buckets = [i for i in range(capacity) if buckets[i].length() >= map._treeify_length]
+        for index in sorted_buckets:
+            cls._treeify(buckets, index)
+        return map
+
+    def reserve(self, count: int) -> None:
+        """
+        Grows the table at most once, so that it holds count keys in total
+        without resizing again.
+
+        :param count: integer, number of keys
+
+        :return: None
+        """
+        # put grows once size reaches capacity, so count keys need count buckets
+        if count > self._capacity:
+            self.resize_table(count)
+
+    @classmethod
+    def from_pairs(cls, pairs, function: callable = hash_function_1, n_hint: int = None,
+                   unique: bool = False, **options) -> "HashMap":
+        """
+        Returns a new hash map holding the given key/value pairs. The map is
+        created at its final capacity, so it never resizes while being filled.
+        With unique, keys are trusted to be distinct and go straight into
+        their bucket without searching it for an existing copy.
+
+        :param pairs: DynamicArray or iterable of (key, value) tuples
+        :param function: hash function
+        :param n_hint: integer, expected number of pairs, so a stream of pairs
+                       is added as it is read instead of collected first
+        :param unique: bool, True if no key appears twice
+        :param options: any other constructor arguments
+
+        :return: HashMap
+        """
+        if n_hint is None or isinstance(pairs, DynamicArray):
+            pairs = list(pairs)
+        if n_hint is None:
+            n_hint = len(pairs)
+
+        map = cls(n_hint, function, **options)
+        add = map._put_new if unique else map._put
+
+        if isinstance(pairs, list):
+            hashes = map._hash_batch([pair[0] for pair in pairs])
+            for i in range(len(pairs)):
+                add(pairs[i][0], pairs[i][1], hashes[i])
+        else:
+            for key, value in pairs:
+                add(key, value, map._hash(key))
+        return map
+
+    def put_many(self, pairs) -> None:
+        """
+        Creates or updates every key/value pair in a batch.
+        The table is resized at most once, for the final count,
+        and every key is hashed up front.
+
+        :param pairs: DynamicArray or iterable of (key, value) tuples
+
+        :return: None
+        """
+        pairs = list(pairs)
+        hashes = self._hash_batch([pair[0] for pair in pairs])
+
+        # Size the table for the whole batch so no put resizes mid-batch
+        self._finish_resize()
+        self.reserve(self._size + len(pairs))
+
+        buckets, capacity = self._buckets.raw(), self._capacity
+        for i in range(len(pairs)):
+            key, value = pairs[i]
+            hash = hashes[i]
+            bucket = buckets[hash % capacity]
+            node = bucket.contains(key, hash, self._reorder)
+            if node:
+                node.value = value
+            else:
+                self._add(bucket, key, value, hash)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns the values associated with a batch of keys, in input order.
+        Missing keys map to None.
+
+        :param keys: DynamicArray or iterable of strings
+
+        :return: DynamicArray
+        """
+        keys = list(keys)
+        hashes = self._hash_batch(keys)
+
+        self._finish_resize()
+        buckets, capacity = self._buckets.raw(), self._capacity
+        returnArr = DynamicArray()
+        for i in range(len(keys)):
+            hash = hashes[i]
+            node = buckets[hash % capacity].contains(keys[i], hash, self._reorder)
+            if node:
+                self._hits += 1
+                returnArr.append(node.value)
+            else:
+                self._misses += 1
+                returnArr.append(None)
+        return returnArr
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes a batch of keys and their associated values from the hash map.
+
+        :param keys: DynamicArray or iterable of strings
+
+        :return: None
+        """
+        keys = list(keys)
+        hashes = self._hash_batch(keys)
+
+        self._finish_resize()
+        buckets, capacity = self._buckets.raw(), self._capacity
+        for i in range(len(keys)):
+            self._detach(buckets[hashes[i] % capacity], keys[i], hashes[i])
+        self._shrink_if_sparse()
+
+
+def _count_shard(values: list) -> list:
+    """
+    Count the occurrences of each value in one shard of a find_mode input.
+    Runs in a worker process and returns a list of (value, count, last index)
+    tuples, ordered by the index of each value's last occurrence in the shard.
+    """
+    map = HashMap(len(values), hash_function_2)
+    hashes = hash_many(values, hash_function_2)
+
+    # Walking the shard backwards, a value is new at its last occurrence
+    last = []
+    for i in range(len(values) - 1, -1, -1):
+        if map._increment(values[i], 1, hashes[i]) == 1:
+            last.append(i)
+
+    return [(values[i], map.get(values[i]), i) for i in reversed(last)]
+
+
+def _parallel_find_mode(da: DynamicArray, workers: int) -> (DynamicArray, int):
+    """
+    find_mode over a process pool: each worker counts one contiguous shard,
+    then the partial counts are merged and scanned for the highest frequency
+    """
+    values = list(da)
+    shard = -(-len(values) // workers)
+    shards = [values[i:i + shard] for i in range(0, len(values), shard)]
+
+    with ProcessPoolExecutor(workers) as pool:
+        partials = list(pool.map(_count_shard, shards))
+
+    # Merge the partial counts; a later shard holds a later last occurrence
+    totals = HashMap(sum(len(counts) for counts in partials), hash_function_2)
+    for start, counts in zip(range(0, len(values), shard), partials):
+        for key, count, last in counts:
+            previous = totals.get(key)
+            if previous is not None:
+                count += previous[0]
+            totals.put(key, (count, start + last))
+
+    # Serial find_mode lists the modes in the order they reach the top
+    # frequency, which is the order of their last occurrences
+    merged = totals.get_keys_and_values()
+    frequency = max(count for _, (count, _) in merged)
+    modes = sorted((last, key) for key, (count, last) in merged if count == frequency)
+
+    numModes = DynamicArray()
+    for _, key in modes:
+        numModes.append(key)
+
+    return numModes, frequency
+
+
+def find_mode(da: DynamicArray, workers: int = 1) -> (DynamicArray, int):
     """
     Returns a tuple containing a dynamic array comprising the mode value(s) of the array,
     and an integer that represents the frequency. With O(N) time complexity.
 
+    With workers > 1 the array is split into shards that are counted in
+    parallel by a process pool and then merged. The modes, their order and
+    the frequency are the same as with a single process.
+
     :param da: DynamicArray
+    :param workers: integer, number of worker processes
 
     :return: Tuple of (DynamicArray, integer)
     """
+    if workers > 1 and da.length() > 0:
+        return _parallel_find_mode(da, workers)
+
     # Using hash_function_2 since assuming all values are strings
     map = HashMap(da.length(), hash_function_2)
 
+    # Hash the whole array up front in one batch
+    hashes = hash_many(da, hash_function_2)
+
     numModes = DynamicArray()
     frequency = 0
 
     for i in range(0, da.length()):
         key = da[i]
-        value = map.get(key)
-        if value:
-            value += 1
-        elif not value:
-            value = 1
-        map.put(key, value)
+        value = map._increment(key, 1, hashes[i])
 
         # Update numModes and frequency
         if value > frequency:
@@ -260,12 +983,71 @@ def find_mode(da: DynamicArray) -> (DynamicArray, int):
             frequency = value
 
         # Check for more multiple modes
-        elif value is frequency:
+        elif value == frequency:
             numModes.append(key)
 
     return numModes, frequency
 
 
+def find_heavy_hitters(stream, k: int = 1, counters: int = 1000, second_pass=None) -> DynamicArray:
+    """
+    Streaming, approximate counterpart of find_mode for inputs too large to hold in memory,
+    such as the lines of a log file. Uses fixed memory: a Misra-Gries summary of at most
+    counters entries kept in a HashMap.
+
+    Every value occurring more than n / (counters + 1) times in a stream of n values is
+    guaranteed to be a candidate. Each candidate's true count lies between its lower and
+    upper bound, which differ by the number of times the summary was decremented.
+    If second_pass is given, it must yield the same values again (for example the file
+    reopened), and the candidates are recounted exactly so both bounds are the true count.
+
+    :param stream: iterable of strings
+    :param k: integer, number of candidates to return
+    :param counters: integer, maximum number of values tracked at once
+    :param second_pass: optional iterable of the same strings, for exact counts
+
+    :return: DynamicArray of (value, lower bound, upper bound) tuples, most frequent first
+    """
+    # Capacity above the counter limit means the summary never resizes
+    summary = HashMap(counters + 1, hash_function_2)
+    decrements = 0
+
+    def bump(key: str, count: int) -> int:
+        """
+        Add one to a tracked value's count, leaving untracked values out of the summary
+        """
+        return count and count + 1
+
+    for value in stream:
+        # Each value is hashed and its chain walked once
+        if summary.get_size() < counters:
+            summary.increment(value)
+
+        # Untracked value and no free counter: decrement them all, dropping the ones that reach zero.
+        # Each decrement cancels counters + 1 occurrences, so this is amortized O(1).
+        elif summary.compute(value, bump) is None:
+            decrements += 1
+            pairs = summary.get_keys_and_values()
+            for i in range(pairs.length()):
+                key, count = pairs[i]
+                if count == 1:
+                    summary.remove(key)
+                else:
+                    summary.put(key, count - 1)
+
+    candidates = [(key, count, count + decrements) for key, count in summary.get_keys_and_values()]
+
+    if second_pass is not None:
+        exact = HashMap(counters + 1, hash_function_2)
+        for value in second_pass:
+            if summary.contains_key(value):
+                exact.increment(value)
+        candidates = [(key, exact.get(key, 0), exact.get(key, 0)) for key, _, _ in candidates]
+
+    candidates.sort(key=lambda candidate: candidate[1], reverse=True)
+    return DynamicArray(candidates[:k])
+
+
 # ------------------- BASIC TESTING ---------------------------------------- #
 
 if __name__ == "__main__":
@@ -466,3 +1248,155 @@ if __name__ == "__main__":
         da = DynamicArray(case)
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\nparallel find_mode example 1")
+    print("-----------------------------")
+    for case in test_cases:
+        da = DynamicArray(case)
+        mode, frequency = find_mode(da, workers=2)
+        print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\nparallel find_mode example 2")
+    print("-----------------------------")
+    # 101 values, each occurring 10 times, so all of them are modes
+    da = DynamicArray(['v' + str(i * 7919 % 101) for i in range(1010)])
+    for workers in (2, 3, 4):
+        serial, parallel = find_mode(da), find_mode(da, workers=workers)
+        print(workers, list(serial[0]) == list(parallel[0]) and serial[1] == parallel[1], parallel[1])
+
+    print("\nfind_heavy_hitters example 1")
+    print("-----------------------------")
+    def log_lines():
+        for i in range(20000):
+            yield 'GET /index' if i % 3 == 0 else 'GET /page' + str(i % 997)
+
+    print(find_heavy_hitters(log_lines(), k=3, counters=50))
+    print(find_heavy_hitters(log_lines(), k=3, counters=50, second_pass=log_lines()))
+
+    print("\nincremental resize example 1")
+    print("----------------------------")
+    m = HashMap(53, hash_function_1, incremental_resize=True)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    result = True
+    for i in range(150):
+        result &= m.get('str' + str(i)) == i * 100
+    print(result, m.empty_buckets(), m.get_size(), m.get_capacity())
+
+    print("\nbulk example 1")
+    print("--------------")
+    m = HashMap(11, hash_function_2)
+    m.put_many(('key' + str(i), i * 10) for i in range(100))
+    print(m.get_size(), m.get_capacity())
+    m.remove_many(DynamicArray(['key' + str(i) for i in range(0, 100, 2)]))
+    print(m.get_size(), m.get_many(['key0', 'key1', 'key2', 'key3', 'key99']))
+
+    print("\ndump/load example 1")
+    print("-------------------")
+    path = os.path.join(tempfile.mkdtemp(), 'map.snap')
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 30):
+        m.put('key' + str(i), i * 10)
+    m.remove('key7')
+    m.dump(path)
+    loaded = HashMap.load(path)
+    print(loaded.get_size(), loaded.get_capacity(), loaded.get('key3'), loaded.get('key7'))
+    print(str(loaded) == str(m))
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+
+    print("\nstats example 1")
+    print("---------------")
+    m = HashMap(11, hash_function_1)
+    for i in range(100):
+        m.put('str' + str(i), i)
+    for i in range(0, 200, 2):
+        m.get('str' + str(i))
+    m.remove('str0')
+    stats = m.stats()
+    print(stats['size'], stats['capacity'], stats['empty_buckets'], stats['resizes'],
+          stats['hits'], stats['misses'])
+    print(stats['chain_lengths'])
+
+    print("\ncapacity policy example 1")
+    print("-------------------------")
+    for policy in ('prime', 'pow2'):
+        m = HashMap(11, hash_function_2, capacity_policy=policy)
+        for i in range(150):
+            m.put('str' + str(i), i * 100)
+        result = True
+        for i in range(150):
+            result &= m.get('str' + str(i)) == i * 100
+        print(policy, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nupsert example 1")
+    print("----------------")
+    m = HashMap(11, hash_function_1)
+    for word in 'the cat and the hat and the bat'.split():
+        m.increment(word)
+    print(m.get('the'), m.get('and'), m.get('dog', 0))
+    print(m.put_if_absent('cat', 10), m.put_if_absent('dog', 10), m.get('dog'))
+    print(m.compute('hat', lambda key, value: value * 5), m.compute('bat', lambda key, value: None))
+    print(m.get_size(), m.contains_key('bat'))
+
+    print("\nshrink example 1")
+    print("----------------")
+    m = HashMap(11, hash_function_2, shrink_load=0.25)
+    for i in range(1000):
+        m.put('str' + str(i), i)
+    print(m.get_size(), m.get_capacity())
+    for i in range(950):
+        m.remove('str' + str(i))
+    print(m.get_size(), m.get_capacity(), m.get('str999'))
+    m.clear(release=True)
+    print(m.get_size(), m.get_capacity())
+
+    print("\nfrom_pairs example 1")
+    print("--------------------")
+    pairs = [('str' + str(i), i) for i in range(1000)]
+    m = HashMap.from_pairs(pairs, hash_function_2, unique=True)
+    print(m.get_size(), m.get_capacity(), m.get('str999'), m.stats()['resizes'])
+    m = HashMap(11, hash_function_2)
+    m.reserve(1000)
+    capacity = m.get_capacity()
+    for key, value in pairs:
+        m.put(key, value)
+    print(m.get_size(), m.get_capacity() == capacity, m.stats()['resizes'])
+
+    print("\nnode pool example 1")
+    print("-------------------")
+    m = HashMap(11, hash_function_2, node_pool=True)
+    for i in range(100):
+        m.put('str' + str(i), i)
+    for i in range(50):
+        m.remove('str' + str(i))
+    for i in range(50):
+        m.put('new' + str(i), i)
+    print(m.get_size(), m.get('str99'), m.get('new49'), m.get('str0'))
+
+    print("\nchain policy example 1")
+    print("----------------------")
+    # hash_function_1 puts anagrams in the same bucket, so these keys share one chain
+    for policy in ('insertion', 'move_to_front', 'transpose'):
+        m = HashMap(11, hash_function_1, chain_policy=policy)
+        for key in ('abc', 'acb', 'bac', 'bca'):
+            m.put(key, key.upper())
+        m.get('abc')
+        print(policy, m.get('abc'), m._bucket(m._hash('abc')))
+
+    print("\ntreeify example 1")
+    print("-----------------")
+    # Every permutation of 'abcd' has the same hash_function_1 hash, so all 24 share one bucket
+    m = HashMap(53, hash_function_1)
+    keys = ['abcd', 'abdc', 'acbd', 'acdb', 'adbc', 'adcb', 'bacd', 'badc', 'bcad', 'bcda', 'bdac', 'bdca',
+            'cabd', 'cadb', 'cbad', 'cbda', 'cdab', 'cdba', 'dabc', 'dacb', 'dbac', 'dbca', 'dcab', 'dcba']
+    for key in keys:
+        m.put(key, key.upper())
+    bucket = m._bucket(m._hash('abcd'))
+    print(type(bucket).__name__, bucket.length(), m.get('dcba'), m.contains_key('abce'))
+    for key in keys[:20]:
+        m.remove(key)
+    bucket = m._bucket(m._hash('abcd'))
+    print(type(bucket).__name__, bucket.length(), m.get('dcba'), m.get_size())
@@ -0,0 +1,341 @@
+# Name: Arman Manukyan
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap
+# Description: Struct-of-arrays variant of the OA (Open Addressing) HashMap.
+
+from array import array
+
+from DynamicArray_LinkedList import (DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2, is_prime, next_prime)
+
+# Per-slot states stored in the state byte array
+_EMPTY = 0
+_FULL = 1
+_TOMBSTONE = 2
+
+# Cached hashes are kept in a signed 64-bit array
+_HASH_MASK = (1 << 63) - 1
+
+
+class HashMap:
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that uses quadratic probing for collision
+        resolution and stores slots as parallel flat arrays instead of
+        one HashEntry object per slot
+        """
+        # capacity must be a prime number
+        self._capacity = next_prime(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+        self._tombstones = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._states[i] == _EMPTY:
+                slot = None
+            else:
+                slot = (f"K: {self._keys[i]} V: {self._values[i]} "
+                        f"TS: {self._states[i] == _TOMBSTONE}")
+            out += str(i) + ': ' + str(slot) + '\n'
+        return out
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Create empty slot arrays for the given capacity
+        """
+        self._hashes = array('q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._states = bytearray(capacity)
+
+    def _find(self, key: str, hash: int) -> int:
+        """
+        Return the slot index holding the given key, or -1 if it is absent
+        """
+        states, hashes, keys = self._states, self._hashes, self._keys
+        capacity = self._capacity
+        index = hash % capacity
+
+        # Quadratic probing on a prime table only reaches capacity // 2 + 1
+        # distinct slots, so the probe stops there even without an empty slot
+        k = 0
+        while states[index] != _EMPTY and k <= capacity // 2:
+            if states[index] == _FULL and hashes[index] == hash and keys[index] == key:
+                return index
+
+            k += 1
+            index = (hash + k * k) % capacity
+
+        return -1
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Creates or updates the key/value pair in the hash map.
+
+        :param key: string
+        :param value: any object
+
+        :return: None
+        """
+        # Double the capacity if size >= capacity / 2
+        if self.table_load() >= 0.5:
+            self.resize_table(self._capacity * 2)
+
+        # Rebuild in place once tombstones push the occupied slots past half,
+        # so every probe sequence still reaches an empty slot
+        elif (self._size + self._tombstones) / self._capacity >= 0.5:
+            self.resize_table(self._capacity)
+
+        hash = self._hash_function(key) & _HASH_MASK
+        states, hashes, keys = self._states, self._hashes, self._keys
+        capacity = self._capacity
+        index = hash % capacity
+        target = -1
+        k = 0
+        while states[index] != _EMPTY and k <= capacity // 2:
+            if states[index] == _FULL:
+                # Update the value in place if the key already exists
+                if hashes[index] == hash and keys[index] == key:
+                    self._values[index] = value
+                    return
+
+            # Remember the first tombstone, but keep probing for the key
+            elif target == -1:
+                target = index
+
+            k += 1
+            index = (hash + k * k) % capacity
+
+        if target == -1:
+            # Every reachable slot is taken; grow and try again
+            if states[index] != _EMPTY:
+                self.resize_table(capacity * 2)
+                self.put(key, value)
+                return
+            target = index
+        else:
+            self._tombstones -= 1
+
+        # Add the new key/value pair
+        states[target] = _FULL
+        hashes[target] = hash
+        keys[target] = key
+        self._values[target] = value
+        self._size += 1
+
+    def table_load(self) -> float:
+        """
+        Returns the current hash table load factor.
+
+        :param: None
+
+        :return: float, load factor
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table.
+
+        :param: None
+
+        :return: integer, empty buckets
+        """
+        return self._states.count(_EMPTY)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table.
+
+        :param new_capacity: integer
+
+        :return: None
+        """
+        if new_capacity >= self._size:
+            if not is_prime(new_capacity):
+                new_capacity = next_prime(new_capacity)
+
+            # Keep at most half the slots full,
+            # so the probe loop below always finds an empty slot
+            while self._size / new_capacity > 0.5:
+                new_capacity = next_prime(new_capacity * 2)
+
+            old_states, old_hashes = self._states, self._hashes
+            old_keys, old_values = self._keys, self._values
+            self._allocate(new_capacity)
+            self._capacity = new_capacity
+            self._tombstones = 0
+
+            # Keys are unique and hashes are cached, so entries are placed
+            # directly in the first empty slot of their probe sequence
+            states, hashes, keys, values = self._states, self._hashes, self._keys, self._values
+            for i in range(len(old_states)):
+                if old_states[i] == _FULL:
+                    hash = old_hashes[i]
+                    index = hash % new_capacity
+                    k = 0
+                    while states[index] != _EMPTY:
+                        k += 1
+                        index = (hash + k * k) % new_capacity
+                    states[index] = _FULL
+                    hashes[index] = hash
+                    keys[index] = old_keys[i]
+                    values[index] = old_values[i]
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key.
+
+        :param key: string
+
+        :return: any object
+        """
+        index = self._find(key, self._hash_function(key) & _HASH_MASK)
+        if index == -1:
+            return None
+        return self._values[index]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map,
+        or False if the key is not in the hash map.
+
+        :param key: string
+
+        :return: bool
+        """
+        return self._find(key, self._hash_function(key) & _HASH_MASK) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+
+        :param key: string
+
+        :return: None
+        """
+        index = self._find(key, self._hash_function(key) & _HASH_MASK)
+        if index != -1:
+            self._states[index] = _TOMBSTONE
+            self._keys[index] = None
+            self._values[index] = None
+            self._size -= 1
+            self._tombstones += 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map.
+
+        :param: None
+
+        :return: None
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value pair.
+
+        :param: None
+
+        :return: DynamicArray
+        """
+        returnArr = DynamicArray()
+        for i in range(self._capacity):
+            if self._states[i] == _FULL:
+                returnArr.append((self._keys[i], self._values[i]))
+        return returnArr
+
+    def __iter__(self):
+        """
+        Iterates across the live entries of the hash map,
+        yielding each one as a HashEntry.
+
+        :param: None
+
+        :return: generator of HashEntry
+        """
+        for i in range(self._capacity):
+            if self._states[i] == _FULL:
+                yield HashEntry(self._keys[i], self._values[i])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    print("\nput example 1")
+    print("-------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nresize example 2")
+    print("----------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nremove example 1")
+    print("----------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'))
+    m.remove('key4')
+
+    print("\nget_keys_and_values example 1")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
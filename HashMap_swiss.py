@@ -0,0 +1,335 @@
+# Name: Arman Manukyan
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap
+# Description: SwissTable style OA (Open Addressing) HashMap with control-byte group probing.
+
+from array import array
+
+from DynamicArray_LinkedList import (DynamicArray, HashEntry,
+                        fmix64, hash_function_1, hash_function_2)
+
+# Slots are probed in groups of this many control bytes
+GROUP_SIZE = 16
+
+# Control bytes: a full slot holds the low 7 bits of its hash (0 - 127)
+_EMPTY = 0x80
+_DELETED = 0xFE
+
+
+class HashMap:
+    # Maximum fraction of slots that may be full or deleted
+    _MAX_LOAD = 7 / 8
+
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that uses open addressing with a separate
+        control-byte array. Each full slot's control byte holds 7 bits of its
+        hash, so lookups scan a whole group of control bytes for candidate
+        slots before comparing any keys, and a miss usually stops at the
+        first group that contains an empty slot.
+        """
+        self._groups = self._group_count(capacity)
+        self._capacity = self._groups * GROUP_SIZE
+        self._allocate(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+        self._tombstones = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._ctrl[i] == _EMPTY:
+                slot = None
+            else:
+                slot = (f"K: {self._keys[i]} V: {self._values[i]} "
+                        f"TS: {self._ctrl[i] == _DELETED}")
+            out += str(i) + ': ' + str(slot) + '\n'
+        return out
+
+    @staticmethod
+    def _group_count(capacity: int) -> int:
+        """
+        Return the power-of-two number of groups needed to hold the given capacity
+        """
+        groups = 1
+        while groups * GROUP_SIZE < capacity:
+            groups *= 2
+        return groups
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Create empty control bytes and slot arrays for the given capacity
+        """
+        self._ctrl = bytearray([_EMPTY]) * capacity
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+
+    def _find(self, key: str, hash: int) -> int:
+        """
+        Return the slot index holding the key with the given mixed hash,
+        or -1 if it is absent
+        """
+        ctrl, hashes, keys = self._ctrl, self._hashes, self._keys
+        tag = hash & 0x7F
+        mask = self._groups - 1
+        group = (hash >> 7) & mask
+
+        # Groups are visited in triangular order, which covers every group
+        # of a power-of-two table
+        for step in range(1, self._groups + 1):
+            start = group * GROUP_SIZE
+            end = start + GROUP_SIZE
+
+            index = ctrl.find(tag, start, end)
+            while index != -1:
+                if hashes[index] == hash and keys[index] == key:
+                    return index
+                index = ctrl.find(tag, index + 1, end)
+
+            # An empty slot means the key was never placed past this group
+            if ctrl.find(_EMPTY, start, end) != -1:
+                return -1
+
+            group = (group + step) & mask
+
+        return -1
+
+    def _free_slot(self, hash: int) -> int:
+        """
+        Return the first empty or deleted slot in the probe sequence of the given mixed hash
+        """
+        ctrl = self._ctrl
+        mask = self._groups - 1
+        group = (hash >> 7) & mask
+        step = 1
+        while True:
+            start = group * GROUP_SIZE
+            for index in range(start, start + GROUP_SIZE):
+                if ctrl[index] & 0x80:
+                    return index
+            group = (group + step) & mask
+            step += 1
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Creates or updates the key/value pair in the hash map.
+
+        :param key: string
+        :param value: any object
+
+        :return: None
+        """
+        # fmix64 spreads the hash so both the group index (high bits)
+        # and the 7-bit control tag (low bits) vary even for small hashes
+        hash = fmix64(self._hash_function(key))
+        index = self._find(key, hash)
+        if index != -1:
+            self._values[index] = value
+            return
+
+        # Grow, or rehash in place when mostly tombstones, before the table fills
+        if self._size + self._tombstones + 1 > self._capacity * self._MAX_LOAD:
+            if self._size + 1 > self._capacity * self._MAX_LOAD / 2:
+                self.resize_table(self._capacity * 2)
+            else:
+                self.resize_table(self._capacity)
+
+        index = self._free_slot(hash)
+        if self._ctrl[index] == _DELETED:
+            self._tombstones -= 1
+        self._ctrl[index] = hash & 0x7F
+        self._hashes[index] = hash
+        self._keys[index] = key
+        self._values[index] = value
+        self._size += 1
+
+    def table_load(self) -> float:
+        """
+        Returns the current hash table load factor.
+
+        :param: None
+
+        :return: float, load factor
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table.
+
+        :param: None
+
+        :return: integer, empty buckets
+        """
+        return self._ctrl.count(_EMPTY)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table.
+        The capacity is rounded up to a power-of-two number of groups
+        that keeps the load under the maximum.
+
+        :param new_capacity: integer
+
+        :return: None
+        """
+        if new_capacity < self._size:
+            return
+
+        groups = self._group_count(new_capacity)
+        while self._size > groups * GROUP_SIZE * self._MAX_LOAD:
+            groups *= 2
+
+        old_ctrl, old_hashes = self._ctrl, self._hashes
+        old_keys, old_values = self._keys, self._values
+        self._groups = groups
+        self._capacity = groups * GROUP_SIZE
+        self._allocate(self._capacity)
+        self._tombstones = 0
+
+        # Keys are unique and hashes are cached, so entries go straight into a free slot
+        for i in range(len(old_ctrl)):
+            if not old_ctrl[i] & 0x80:
+                hash = old_hashes[i]
+                index = self._free_slot(hash)
+                self._ctrl[index] = old_ctrl[i]
+                self._hashes[index] = hash
+                self._keys[index] = old_keys[i]
+                self._values[index] = old_values[i]
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key.
+
+        :param key: string
+
+        :return: any object
+        """
+        index = self._find(key, fmix64(self._hash_function(key)))
+        if index == -1:
+            return None
+        return self._values[index]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map,
+        or False if the key is not in the hash map.
+
+        :param key: string
+
+        :return: bool
+        """
+        return self._find(key, fmix64(self._hash_function(key))) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+
+        :param key: string
+
+        :return: None
+        """
+        index = self._find(key, fmix64(self._hash_function(key)))
+        if index != -1:
+            self._ctrl[index] = _DELETED
+            self._keys[index] = None
+            self._values[index] = None
+            self._size -= 1
+            self._tombstones += 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map.
+
+        :param: None
+
+        :return: None
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value pair.
+
+        :param: None
+
+        :return: DynamicArray
+        """
+        returnArr = DynamicArray()
+        for i in range(self._capacity):
+            if not self._ctrl[i] & 0x80:
+                returnArr.append((self._keys[i], self._values[i]))
+        return returnArr
+
+    def __iter__(self):
+        """
+        Iterates across the live entries of the hash map,
+        yielding each one as a HashEntry.
+
+        :param: None
+
+        :return: generator of HashEntry
+        """
+        for i in range(self._capacity):
+            if not self._ctrl[i] & 0x80:
+                yield HashEntry(self._keys[i], self._values[i])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    print("\nput example 1")
+    print("-------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\ncontains_key example 2")
+    print("----------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+    result = True
+    for key in keys:
+        # all inserted keys must be present
+        result &= m.contains_key(str(key))
+        # NOT inserted keys must be absent
+        result &= not m.contains_key(str(key + 1))
+    print(result)
+
+    print("\nget_keys_and_values example 1")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_size(), m.get_capacity(), m.get('20'), m.get('1'))
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
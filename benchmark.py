@@ -0,0 +1,721 @@
+# Name: Arman Manukyan
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap
+# Description: Benchmarks for the SC (Separate Chaining) and OA (Open Addressing) HashMaps.
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import string
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import DynamicArray_LinkedList
+import HashMap_concurrent
+import HashMap_mmap
+import HashMap_oa
+import HashMap_sc
+import HashMap_soa
+import HashMap_swiss
+from DynamicArray_LinkedList import (DynamicArray, hash_function_1, hash_function_2, hash_many,
+                        hash_fnv1a, hash_mix64, make_siphash, next_prime)
+
+MAPS = {'sc': HashMap_sc.HashMap, 'oa': HashMap_oa.HashMap}
+HASH_FUNCTIONS = {'h1': hash_function_1, 'h2': hash_function_2, 'fnv1a': hash_fnv1a,
+                  'mix64': hash_mix64, 'siphash': make_siphash(0)}
+
+# Fractions of get, put and remove in each suite operation mix
+MIXES = {'read': (0.9, 0.1, 0.0), 'mixed': (0.5, 0.3, 0.2), 'write': (0.1, 0.5, 0.4)}
+DISTRIBUTIONS = ('sequential', 'random', 'anagram', 'zipf')
+
+
+def make_keys(count: int, length: int, seed: int = 0) -> list:
+    """
+    Return count distinct random string keys of the given length
+    """
+    rng = random.Random(seed)
+    keys = set()
+    while len(keys) < count:
+        keys.add(''.join(rng.choices(string.ascii_letters, k=length)))
+    return list(keys)
+
+
+def timed(fn, *args) -> float:
+    """
+    Return the wall-clock seconds taken by fn(*args)
+    """
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def rehash_resize(m, new_capacity: int) -> None:
+    """
+    Resize the way resize_table did before hashes were cached:
+    collect every pair, empty and resize the table, and re-put each key (rehashing it)
+    """
+    pairs = m.get_keys_and_values()
+    m.clear()
+    m.resize_table(new_capacity)
+    for i in range(pairs.length()):
+        m.put(pairs[i][0], pairs[i][1])
+
+
+def bench_resize(count: int, length: int) -> None:
+    """
+    Compare resize_table, which reuses cached hashes,
+    against the same resize done by rehashing every key
+    """
+    keys = make_keys(count, length)
+    print(f"{'map':<4}{'hash':<6}{'cached (s)':>12}{'rehash (s)':>12}{'speedup':>10}")
+    for map_name, map_class in MAPS.items():
+        for hash_name, function in HASH_FUNCTIONS.items():
+            maps = []
+            for _ in range(2):
+                m = map_class(count * 2, function)
+                for key in keys:
+                    m.put(key, key)
+                maps.append(m)
+            new_capacity = maps[0].get_capacity() * 2
+
+            cached = timed(maps[0].resize_table, new_capacity)
+            uncached = timed(rehash_resize, maps[1], new_capacity)
+            print(f"{map_name:<4}{hash_name:<6}{cached:>12.4f}{uncached:>12.4f}"
+                  f"{uncached / cached:>9.1f}x")
+
+
+def bench_hash_many(count: int, length: int) -> None:
+    """
+    Compare hashing a batch of keys with hash_many against a per-key loop
+    """
+    keys = make_keys(count, length)
+    print(f"{'hash':<6}{'loop (s)':>12}{'batch (s)':>12}{'speedup':>10}")
+    for hash_name, function in HASH_FUNCTIONS.items():
+        loop = timed(lambda: [function(key) for key in keys])
+        batch = timed(hash_many, keys, function)
+        print(f"{hash_name:<6}{loop:>12.4f}{batch:>12.4f}{loop / batch:>9.1f}x")
+
+
+def probe_length(m, key: str) -> int:
+    """
+    Return the number of slots a lookup of a present key inspects in an OA map
+    """
+    hash = m._hash(key)
+    capacity = m.get_capacity()
+    index = hash % capacity
+    if m._robin_hood:
+        step, growth = 1, 0
+    else:
+        step, growth = m._probe_step(key, hash), m._probe_growth
+
+    count = 1
+    entry = m._buckets[index]
+    while entry.is_tombstone or entry.hash != hash or entry.key != key:
+        count += 1
+        index = (index + step) % capacity
+        step += growth
+        entry = m._buckets[index]
+    return count
+
+
+def bench_probing(count: int, function_name: str) -> None:
+    """
+    Report average and maximum probe length and lookup throughput
+    for every OA probing strategy, on sequential and random keys
+    """
+    function = HASH_FUNCTIONS[function_name]
+    distributions = {
+        'sequential': ['str' + str(i) for i in range(count)],
+        'random': make_keys(count, 12),
+    }
+    strategies = [('linear', 0.5), ('quadratic', 0.5), ('triangular', 0.5), ('double', 0.5),
+                  ('robin_hood', 0.5), ('linear', 0.9), ('double', 0.9), ('robin_hood', 0.9)]
+
+    print(f"{'strategy':<12}{'load':>6}{'keys':>12}{'avg probe':>11}{'max probe':>11}{'gets/s':>12}")
+    for probing, load_factor in strategies:
+        for dist_name, keys in distributions.items():
+            m = HashMap_oa.HashMap(11, function, probing, load_factor)
+            for key in keys:
+                m.put(key, key)
+
+            lengths = [probe_length(m, key) for key in keys]
+            elapsed = timed(lambda: [m.get(key) for key in keys])
+            print(f"{probing:<12}{load_factor:>6}{dist_name:>12}{sum(lengths) / count:>11.2f}"
+                  f"{max(lengths):>11}{count / elapsed:>12.0f}")
+
+
+def bench_misses(count: int, function_name: str) -> None:
+    """
+    Compare contains_key throughput on hits and misses across the OA layouts
+    """
+    function = HASH_FUNCTIONS[function_name]
+    keys = make_keys(count * 2, 12)
+    present, absent = keys[:count], keys[count:]
+    layouts = {'oa': HashMap_oa.HashMap, 'soa': HashMap_soa.HashMap, 'swiss': HashMap_swiss.HashMap}
+
+    print(f"{'map':<8}{'hits/s':>12}{'misses/s':>12}")
+    for name, map_class in layouts.items():
+        m = map_class(11, function)
+        for key in present:
+            m.put(key, key)
+        hits = timed(lambda: [m.contains_key(key) for key in present])
+        misses = timed(lambda: [m.contains_key(key) for key in absent])
+        print(f"{name:<8}{count / hits:>12.0f}{count / misses:>12.0f}")
+
+
+def bench_concurrent(ops: int, max_threads: int) -> None:
+    """
+    Compare the lock-striped map against an SC map behind one global lock,
+    running a mixed get/put/remove workload from increasing thread counts
+    """
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f"GIL enabled: {gil}")
+    keys = make_keys(ops, 12)
+
+    def run(m, lock, threads):
+        share = ops // threads
+
+        def worker(number):
+            own = keys[number * share:(number + 1) * share]
+            for i, key in enumerate(own):
+                if lock:
+                    with lock:
+                        m.put(key, i)
+                        m.get(own[i // 2])
+                        if i % 4 == 0:
+                            m.remove(own[i // 2])
+                else:
+                    m.put(key, i)
+                    m.get(own[i // 2])
+                    if i % 4 == 0:
+                        m.remove(own[i // 2])
+
+        pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        start = time.perf_counter()
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        return time.perf_counter() - start
+
+    print(f"{'threads':<9}{'global lock ops/s':>20}{'striped ops/s':>16}")
+    threads = 1
+    while threads <= max_threads:
+        locked = run(HashMap_sc.HashMap(11, hash_function_2), threading.Lock(), threads)
+        striped = run(HashMap_concurrent.HashMap(11, hash_function_2), None, threads)
+        print(f"{threads:<9}{ops / locked:>20.0f}{ops / striped:>16.0f}")
+        threads *= 2
+
+
+def bench_find_mode(count: int, distinct: int, max_workers: int) -> None:
+    """
+    Time find_mode on count strings drawn from distinct values,
+    sequentially and with increasing numbers of worker processes
+    """
+    rng = random.Random(0)
+    da = DynamicArray(['value' + str(rng.randrange(distinct)) for _ in range(count)])
+    print(f"cpus: {os.cpu_count()}")
+
+    print(f"{'workers':<9}{'seconds':>10}{'speedup':>10}")
+    baseline = None
+    workers = 1
+    while workers <= max_workers:
+        elapsed = timed(HashMap_sc.find_mode, da, workers)
+        baseline = baseline or elapsed
+        print(f"{workers:<9}{elapsed:>10.2f}{baseline / elapsed:>9.1f}x")
+        workers *= 2
+
+
+def bench_mmap(count: int) -> None:
+    """
+    Compare reopening a memory-mapped map against rebuilding an in-memory map by put
+    """
+    keys = make_keys(count, 12)
+    with tempfile.TemporaryDirectory() as directory:
+        path = directory + '/bench.hmap'
+        with HashMap_mmap.HashMap(path, count * 2, hash_function_2) as m:
+            for key in keys:
+                m.put(key, key)
+
+        start = time.perf_counter()
+        m = HashMap_mmap.HashMap(path, function=hash_function_2, readonly=True)
+        opened = time.perf_counter() - start
+        lookups = timed(lambda: [m.get(key) for key in keys])
+        m.close()
+
+    rebuilt = HashMap_oa.HashMap(count * 2, hash_function_2)
+    rebuild = timed(lambda: [rebuilt.put(key, key) for key in keys])
+    print(f"open mmap: {opened * 1000:.2f} ms, rebuild by put: {rebuild * 1000:.0f} ms, "
+          f"mmap gets/s: {count / lookups:.0f}")
+
+
+def trial_division_prime(capacity: int) -> int:
+    """
+    Return the smallest odd prime that is at least capacity, found by trial
+    division the way the maps did before the shared prime sieve
+    """
+    capacity += capacity % 2 == 0
+    while capacity < 3 or any(capacity % factor == 0 for factor in range(3, int(capacity ** 0.5) + 1, 2)):
+        capacity += 2
+    return capacity
+
+
+def bench_capacity(count: int, function_name: str) -> None:
+    """
+    Compare the 'prime' and 'pow2' capacity policies: the cost of choosing a
+    capacity, then put and get throughput and total resize time for both maps
+    """
+    function = HASH_FUNCTIONS[function_name]
+    rng = random.Random(0)
+    capacities = [rng.randrange(1, count * 4) for _ in range(10_000)]
+
+    pow2 = HashMap_sc.HashMap(1, function, capacity_policy='pow2')._next_capacity
+    next_prime(count * 4)
+    print(f"{'capacity lookup':<18}{'us/call':>10}")
+    for name, lookup in (('trial division', trial_division_prime), ('prime sieve', next_prime), ('pow2', pow2)):
+        elapsed = timed(lambda: [lookup(capacity) for capacity in capacities])
+        print(f"{name:<18}{elapsed / len(capacities) * 1e6:>10.2f}")
+
+    keys = make_keys(count, 12)
+    print(f"\n{'map':<4}{'policy':<8}{'puts/s':>12}{'gets/s':>12}{'resize (s)':>12}{'capacity':>10}")
+    for map_name, map_class in MAPS.items():
+        for policy in ('prime', 'pow2'):
+            best = None
+            for _ in range(3):
+                m = map_class(11, function, capacity_policy=policy)
+                puts = timed(lambda: [m.put(key, key) for key in keys])
+                gets = timed(lambda: [m.get(key) for key in keys])
+                run = (puts, gets, m.stats()['resize_seconds'])
+                best = min(best or run, run, key=lambda times: times[0] + times[1])
+            print(f"{map_name:<4}{policy:<8}{count / best[0]:>12.0f}{count / best[1]:>12.0f}"
+                  f"{best[2]:>12.4f}{m.get_capacity():>10}")
+
+
+def bench_chain_policy(count: int, lookups: int, skew: float, function_name: str) -> None:
+    """
+    Compare SC chain policies on a Zipf key stream: average nodes visited per
+    lookup (counted by walking the chain before each get, or as bisection
+    steps in a treeified bucket) and get throughput
+    """
+    function = HASH_FUNCTIONS[function_name]
+    keys = make_keys(count, 12)
+    rng = random.Random(0)
+
+    # Popularity is independent of insertion order, so hot keys start anywhere in their chain
+    ranked = keys[:]
+    rng.shuffle(ranked)
+    weights = list(itertools.accumulate(1 / (i + 1) ** skew for i in range(count)))
+    stream = rng.choices(ranked, cum_weights=weights, k=lookups)
+
+    # Each policy with its default treeify length, then insertion order without treeify
+    print(f"{'policy':<15}{'treeify':>8}{'nodes/lookup':>14}{'gets/s':>12}")
+    for policy, treeify_length in (('insertion', None), ('move_to_front', None),
+                                   ('transpose', None), ('insertion', 0)):
+        m = HashMap_sc.HashMap(11, function, chain_policy=policy, treeify_length=treeify_length)
+        for key in keys:
+            m.put(key, key)
+        visited = 0
+        for key in stream:
+            bucket = m._bucket(m._hash(key))
+            if isinstance(bucket, DynamicArray_LinkedList.SortedBucket):
+                # Bisection compares against about log2(n) keys, not every key before this one
+                visited += bucket.length().bit_length()
+            else:
+                for position, node in enumerate(bucket, 1):
+                    if node.key == key:
+                        break
+                visited += position
+            m.get(key)
+
+        m = HashMap_sc.HashMap(11, function, chain_policy=policy, treeify_length=treeify_length)
+        for key in keys:
+            m.put(key, key)
+        elapsed = timed(lambda: [m.get(key) for key in stream])
+        print(f"{policy:<15}{m._treeify_length:>8}{visited / lookups:>14.2f}{lookups / elapsed:>12.0f}")
+
+
+def make_workload(distribution: str, size: int, seed: int) -> tuple:
+    """
+    Return (keys, accesses) for a key distribution, where accesses is a list of
+    size indices into keys in the order the workload touches them
+    """
+    rng = random.Random(seed)
+    if distribution == 'sequential':
+        keys = ['str' + str(i) for i in range(size)]
+    elif distribution == 'anagram':
+        # Groups of up to 24 permutations of the same letters, which
+        # hash_function_1 maps to the same value
+        keys = []
+        seen = set()
+        while len(keys) < size:
+            letters = rng.choices(string.ascii_lowercase, k=10)
+            for _ in range(24):
+                rng.shuffle(letters)
+                key = ''.join(letters)
+                if key not in seen and len(keys) < size:
+                    seen.add(key)
+                    keys.append(key)
+    else:
+        keys = make_keys(size, 12, seed)
+
+    if distribution == 'zipf':
+        # Key i is accessed with weight 1 / (i + 1)
+        weights = list(itertools.accumulate(1 / (i + 1) for i in range(size)))
+        accesses = rng.choices(range(size), cum_weights=weights, k=size)
+    else:
+        accesses = [rng.randrange(size) for _ in range(size)]
+    return keys, accesses
+
+
+def percentile(ordered: list, fraction: float) -> float:
+    """
+    Return the nearest-rank percentile of an already sorted list
+    """
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_workload(map_class, function, keys: list, accesses: list, mix: tuple, seed: int) -> dict:
+    """
+    Build a map from keys by put, then run one get/put/remove operation per access.
+    Return build and workload throughput and workload latency percentiles.
+    """
+    rng = random.Random(seed)
+    ops = rng.choices(range(3), weights=mix, k=len(accesses))
+
+    m = map_class(11, function)
+    build = timed(lambda: [m.put(key, key) for key in keys])
+
+    clock = time.perf_counter_ns
+    latencies = []
+    for op, index in zip(ops, accesses):
+        key = keys[index]
+        start = clock()
+        if op == 0:
+            m.get(key)
+        elif op == 1:
+            m.put(key, index)
+        else:
+            m.remove(key)
+        latencies.append(clock() - start)
+
+    latencies.sort()
+    return {
+        'build_ops': len(keys) / build,
+        'ops': len(latencies) / (sum(latencies) / 1e9),
+        'p50_ns': percentile(latencies, 0.5),
+        'p90_ns': percentile(latencies, 0.9),
+        'p99_ns': percentile(latencies, 0.99),
+        'max_ns': latencies[-1],
+    }
+
+
+def build_map(map_class, capacity: int, function, keys: list) -> object:
+    """
+    Return a map of the given class built from keys by put
+    """
+    m = map_class(capacity, function)
+    for key in keys:
+        m.put(key, key)
+    return m
+
+
+def peak_memory(map_class, function, keys: list) -> int:
+    """
+    Return the peak bytes allocated while building a map from keys by put
+    """
+    # One untraced build first, so one-time growth of module-level caches
+    # (the shared prime sieve) is not charged to the map
+    build_map(map_class, 11, function, keys)
+
+    tracemalloc.start()
+    build_map(map_class, 11, function, keys)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def bench_distribution(count: int) -> None:
+    """
+    Report how evenly each hash function spreads keys over a prime number of
+    buckets about equal to count: the chi-squared statistic per degree of freedom
+    (close to 1.0 for a uniform hash, far above it when keys pile up),
+    the longest chain, the fraction of empty buckets and the hashing rate
+    """
+    capacity = next_prime(count)
+    expected = count / capacity
+
+    print(f"buckets: {capacity}")
+    print(f"{'keys':<12}{'hash':<9}{'chi2/df':>10}{'max chain':>11}{'empty %':>9}{'keys/s':>12}")
+    for distribution in ('sequential', 'random', 'anagram'):
+        if distribution == 'sequential':
+            keys = ['key' + str(i) for i in range(count)]
+        else:
+            keys = make_workload(distribution, count, 0)[0]
+
+        for hash_name, function in HASH_FUNCTIONS.items():
+            start = time.perf_counter()
+            hashes = [function(key) for key in keys]
+            elapsed = time.perf_counter() - start
+
+            buckets = [0] * capacity
+            for hash in hashes:
+                buckets[hash % capacity] += 1
+            chi2 = sum((n - expected) ** 2 for n in buckets) / expected
+            print(f"{distribution:<12}{hash_name:<9}{chi2 / (capacity - 1):>10.2f}{max(buckets):>11}"
+                  f"{buckets.count(0) / capacity:>9.1%}{count / elapsed:>12.0f}")
+
+
+class DictSLNode:
+    """
+    SLNode as it was before __slots__, with a per-instance __dict__
+    """
+
+    def __init__(self, key: str, value: object, next: "DictSLNode" = None, hash: int = None) -> None:
+        self.key = key
+        self.value = value
+        self.next = next
+        self.hash = hash
+
+
+class DictHashEntry:
+    """
+    HashEntry as it was before __slots__, with a per-instance __dict__
+    """
+
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
+        self.key = key
+        self.value = value
+        self.hash = hash
+        self.is_tombstone = False
+
+
+def use_node_classes(sl_node: type, hash_entry: type) -> None:
+    """
+    Make both maps allocate their nodes from the given classes
+    """
+    DynamicArray_LinkedList.SLNode = sl_node
+    HashMap_oa.HashEntry = hash_entry
+
+
+def bench_memory(count: int) -> None:
+    """
+    Compare bytes per entry held by each map with dict-based and slotted nodes,
+    then the time to churn (remove and re-put) a tenth of the keys with and
+    without the node free-list, under a clustering and a well-spread hash
+    """
+    keys = make_keys(count, 12)
+    churn = keys[:count // 10]
+    slotted = (DynamicArray_LinkedList.SLNode, HashMap_oa.HashEntry)
+
+    print(f"{'map':<4}{'dict B/entry':>14}{'slots B/entry':>15}{'saved':>8}")
+    for map_name, map_class in MAPS.items():
+        sizes = []
+        # Untraced warm-up build, so the shared prime sieve is already grown
+        build_map(map_class, count, hash_function_2, keys)
+        for nodes in ((DictSLNode, DictHashEntry), slotted):
+            use_node_classes(*nodes)
+            tracemalloc.start()
+            m = build_map(map_class, count, hash_function_2, keys)
+            sizes.append(tracemalloc.get_traced_memory()[0] / count)
+            tracemalloc.stop()
+            del m
+        use_node_classes(*slotted)
+        print(f"{map_name:<4}{sizes[0]:>14.1f}{sizes[1]:>15.1f}{1 - sizes[1] / sizes[0]:>8.0%}")
+
+    print(f"\n{'map':<4}{'hash':<7}{'churn (s)':>11}{'pooled (s)':>12}{'pooled/plain':>14}")
+    for map_name, map_class in MAPS.items():
+        for hash_name in ('h2', 'fnv1a'):
+            times = []
+            for node_pool in (False, True):
+                m = map_class(count, HASH_FUNCTIONS[hash_name], node_pool=node_pool)
+                for key in keys:
+                    m.put(key, key)
+
+                def run():
+                    for _ in range(3):
+                        for key in churn:
+                            m.remove(key)
+                        for key in churn:
+                            m.put(key, key)
+                times.append(min(timed(run) for _ in range(3)))
+            print(f"{map_name:<4}{hash_name:<7}{times[0]:>11.3f}{times[1]:>12.3f}"
+                  f"{times[1] / times[0]:>14.2f}")
+
+
+def bench_suite(maps: list, hashes: list, distributions: list, sizes: list,
+                mixes: list, repeat: int, seed: int) -> dict:
+    """
+    Run every combination of map, hash function, key distribution, size and
+    operation mix. Each metric of a combination is the median of its repeat
+    runs, so one noisy run does not move it, and 'spread' records how far the
+    runs were apart, as a fraction of that median. Peak memory is measured in
+    a separate untimed build, since tracing allocations slows everything down.
+    """
+    results = []
+    print(f"{'map':<4}{'hash':<6}{'keys':<12}{'size':>9}{'mix':>7}"
+          f"{'build/s':>11}{'ops/s':>11}{'p50 ns':>9}{'p99 ns':>9}{'peak KiB':>10}")
+    for size, distribution in itertools.product(sizes, distributions):
+        keys, accesses = make_workload(distribution, size, seed)
+        for map_name, hash_name in itertools.product(maps, hashes):
+            map_class, function = MAPS[map_name], HASH_FUNCTIONS[hash_name]
+            memory = peak_memory(map_class, function, keys)
+            for mix_name in mixes:
+                runs = [run_workload(map_class, function, keys, accesses, MIXES[mix_name], seed)
+                        for _ in range(repeat)]
+                result = {'map': map_name, 'hash': hash_name, 'distribution': distribution,
+                          'size': size, 'mix': mix_name, 'peak_bytes': memory}
+                spread = {}
+                for metric in runs[0]:
+                    samples = [run[metric] for run in runs]
+                    result[metric] = statistics.median(samples)
+                    spread[metric] = (max(samples) - min(samples)) / (result[metric] or 1)
+                result['spread'] = spread
+                results.append(result)
+                print(f"{map_name:<4}{hash_name:<6}{distribution:<12}{size:>9}{mix_name:>7}"
+                      f"{result['build_ops']:>11.0f}{result['ops']:>11.0f}{result['p50_ns']:>9}"
+                      f"{result['p99_ns']:>9}{memory / 1024:>10.0f}")
+
+    return {
+        'meta': {'python': platform.python_version(), 'implementation': platform.python_implementation(),
+                 'platform': platform.platform(), 'seed': seed, 'repeat': repeat},
+        'results': results,
+    }
+
+
+def compare_suite(report: dict, baseline: dict, threshold: float) -> int:
+    """
+    Print every result whose throughput fell, or whose p99 latency or peak memory
+    rose, by more than threshold against the matching baseline result.
+    The threshold is widened by the larger spread of the metric across repeat
+    runs in either report, so run-to-run noise is not reported as a regression.
+    Metrics that were 0 in the baseline have no relative change and are skipped.
+    Return the number of regressions.
+    """
+    def name(result):
+        return (result['map'], result['hash'], result['distribution'], result['size'], result['mix'])
+
+    previous = {name(result): result for result in baseline['results']}
+    checks = (('build_ops', -1), ('ops', -1), ('p99_ns', 1), ('peak_bytes', 1))
+    regressions = 0
+    for result in report['results']:
+        old = previous.get(name(result))
+        if old is None:
+            continue
+        for metric, direction in checks:
+            if not old[metric]:
+                continue
+            change = (result[metric] - old[metric]) / old[metric]
+            noise = max(result.get('spread', {}).get(metric, 0), old.get('spread', {}).get(metric, 0))
+            if change * direction > threshold + noise:
+                regressions += 1
+                print(f"REGRESSION {' '.join(str(part) for part in name(result))} "
+                      f"{metric}: {old[metric]:.0f} -> {result[metric]:.0f} ({change:+.0%})")
+
+    print(f"{regressions} regression(s) against baseline, threshold {threshold:.0%}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    resize = commands.add_parser('resize', help='resize_table with cached hashes vs rehashing')
+    resize.add_argument('--count', type=int, default=100_000)
+    resize.add_argument('--length', type=int, default=64)
+
+    hashing = commands.add_parser('hash', help='hash_many batches vs hashing key by key')
+    hashing.add_argument('--count', type=int, default=1_000_000)
+    hashing.add_argument('--length', type=int, default=16)
+
+    probing = commands.add_parser('probing', help='probe lengths and throughput per OA probing strategy')
+    probing.add_argument('--count', type=int, default=20_000)
+    probing.add_argument('--hash', choices=HASH_FUNCTIONS, default='h2')
+
+    misses = commands.add_parser('misses', help='contains_key hits and misses per OA layout')
+    misses.add_argument('--count', type=int, default=20_000)
+    misses.add_argument('--hash', choices=HASH_FUNCTIONS, default='h2')
+
+    concurrent = commands.add_parser('concurrent', help='striped vs globally locked map under threads')
+    concurrent.add_argument('--ops', type=int, default=100_000)
+    concurrent.add_argument('--threads', type=int, default=8)
+
+    mode = commands.add_parser('mode', help='find_mode across worker process counts')
+    mode.add_argument('--count', type=int, default=10_000_000)
+    mode.add_argument('--distinct', type=int, default=100_000)
+    mode.add_argument('--workers', type=int, default=os.cpu_count())
+
+    mapped = commands.add_parser('mmap', help='reopening a memory-mapped map vs rebuilding')
+    mapped.add_argument('--count', type=int, default=50_000)
+
+    capacity = commands.add_parser('capacity', help="'prime' vs 'pow2' capacity policy")
+    capacity.add_argument('--count', type=int, default=100_000)
+    capacity.add_argument('--hash', choices=HASH_FUNCTIONS, default='fnv1a')
+
+    distribution = commands.add_parser('distribution', help='bucket distribution quality per hash function')
+    distribution.add_argument('--count', type=int, default=100_000)
+
+    chains = commands.add_parser('chains', help='SC chain policies on a Zipf key stream')
+    chains.add_argument('--count', type=int, default=20_000)
+    chains.add_argument('--lookups', type=int, default=200_000)
+    chains.add_argument('--skew', type=float, default=1.0)
+    chains.add_argument('--hash', choices=HASH_FUNCTIONS, default='h1')
+
+    memory = commands.add_parser('memory', help='bytes per entry with dict vs slotted nodes, node free-list churn')
+    memory.add_argument('--count', type=int, default=1_000_000)
+
+    suite = commands.add_parser('suite', help='parametrized suite with JSON output and baseline comparison')
+    suite.add_argument('--maps', nargs='+', choices=MAPS, default=list(MAPS))
+    suite.add_argument('--hashes', nargs='+', choices=HASH_FUNCTIONS, default=list(HASH_FUNCTIONS))
+    suite.add_argument('--distributions', nargs='+', choices=DISTRIBUTIONS, default=list(DISTRIBUTIONS))
+    suite.add_argument('--sizes', nargs='+', type=int, default=[1_000, 10_000])
+    suite.add_argument('--mixes', nargs='+', choices=MIXES, default=list(MIXES))
+    suite.add_argument('--repeat', type=int, default=3)
+    suite.add_argument('--seed', type=int, default=0)
+    suite.add_argument('--output', help='write the JSON report to this file')
+    suite.add_argument('--compare', help='baseline JSON report to check for regressions')
+    suite.add_argument('--threshold', type=float, default=0.10)
+
+    args = parser.parse_args()
+    if args.command == 'resize':
+        bench_resize(args.count, args.length)
+    elif args.command == 'hash':
+        bench_hash_many(args.count, args.length)
+    elif args.command == 'probing':
+        bench_probing(args.count, args.hash)
+    elif args.command == 'misses':
+        bench_misses(args.count, args.hash)
+    elif args.command == 'concurrent':
+        bench_concurrent(args.ops, args.threads)
+    elif args.command == 'mode':
+        bench_find_mode(args.count, args.distinct, args.workers)
+    elif args.command == 'mmap':
+        bench_mmap(args.count)
+    elif args.command == 'capacity':
+        bench_capacity(args.count, args.hash)
+    elif args.command == 'distribution':
+        bench_distribution(args.count)
+    elif args.command == 'chains':
+        bench_chain_policy(args.count, args.lookups, args.skew, args.hash)
+    elif args.command == 'memory':
+        bench_memory(args.count)
+    elif args.command == 'suite':
+        # With fewer repeats, run-to-run noise alone exceeds the default threshold
+        if args.compare and args.repeat < 3:
+            parser.error('--compare needs --repeat 3 or more')
+        report = bench_suite(args.maps, args.hashes, args.distributions, args.sizes,
+                             args.mixes, args.repeat, args.seed)
+        if args.output:
+            with open(args.output, 'w') as file:
+                json.dump(report, file, indent=2)
+        if args.compare:
+            with open(args.compare) as file:
+                baseline = json.load(file)
+            if compare_suite(report, baseline, args.threshold):
+                sys.exit(1)